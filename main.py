@@ -1,13 +1,15 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Depends, status, BackgroundTasks
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Depends, status, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DESCENDING, ReturnDocument
 from pydantic import BaseModel, EmailStr
 from bson import ObjectId
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
 from datetime import datetime, timedelta
-import hashlib
+from collections import OrderedDict
 import jwt
 import os
 import random
@@ -19,18 +21,33 @@ from urllib import request as urlrequest
 from urllib.error import HTTPError, URLError
 import asyncio
 import time
+import tempfile
+import zlib
+import hmac
+from utils.session_cache import SessionCache
+from utils.activity_buffer import SessionActivityBuffer
+from utils.password_hasher import PasswordHasher
+from utils.session_generations import SessionGenerationMap
+from utils.session_store import SessionStore
+from utils.token_cache import TokenClaimsCache
+from utils.google_auth import GoogleKeySet, GoogleTokenError, GoogleTokenVerifier, DEFAULT_JWKS_URL, DEFAULT_ISSUERS, FIREBASE_JWKS_URL
+from utils.rate_limit import InMemoryRateLimiter, MongoRateLimiter, RateLimitMiddleware, RateLimitPolicy
+from utils.invalidation_bus import ChangeStreamTransport, InvalidationBus, UnixSocketTransport
+from utils.pagination import InvalidCursor, page_filter, page_projection, paginate, split_page
+from utils.export import csv_chunks, gzip_chunks, ndjson_chunks, parse_fields
+from utils.indexes import RETIRED_INDEXES, app_indexes, ensure_indexes
+from utils.query_monitor import NPlusOneMiddleware, QueryMonitor, QueryMonitorMiddleware
+from utils.json_response import FastJSONResponse, dumps
+from utils.json_stream import json_array_response
+from utils.raw_json import RAW_CODEC_OPTIONS, raw_list_body
+from utils.content_cache import ContentCache
+from utils.content_versions import ContentVersions
+from utils.fieldsets import fieldset_projection, narrow_projection
+from utils.compression import BROTLI_AVAILABLE, CompressedBodyCache, CompressionMiddleware
+from auth import pwd_context
 
 # FastAPI App
-app = FastAPI(title="VIDYARTHI MITRAA API", version="1.0.0")
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app = FastAPI(title="VIDYARTHI MITRAA API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Static Files
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -38,7 +55,14 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 # MongoDB Connection
 MONGODB_URL = "mongodb://localhost:27017"
 DATABASE_NAME = "vidyarthi_mitraa"
-client = AsyncIOMotorClient(MONGODB_URL)
+
+# Per-route MongoDB command statistics (GET /debug/queries); commands slower
+# than QUERY_SLOW_MS are logged
+QUERY_MONITOR_ENABLED = os.getenv("QUERY_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "100"))
+query_monitor = QueryMonitor(slow_ms=QUERY_SLOW_MS)
+
+client = AsyncIOMotorClient(MONGODB_URL, event_listeners=[query_monitor] if QUERY_MONITOR_ENABLED else [])
 db = client[DATABASE_NAME]
 
 # JWT Settings
@@ -66,6 +90,58 @@ os.makedirs(os.path.join(UPLOAD_DIR, "questions"), exist_ok=True)
 # Simple in-memory toggle for dual-login feature
 DUAL_LOGIN_ENABLED = False
 
+# Validated sessions are cached per process so warm requests skip Mongo.
+# The TTL bounds how long a session ended elsewhere can still be accepted here.
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "50000"))
+session_cache = SessionCache(ttl_seconds=SESSION_CACHE_TTL_SECONDS, max_entries=SESSION_CACHE_MAX_ENTRIES)
+
+# Auth mode: "session" validates tokens against user_sessions (cached),
+# "generation" compares the token's session generation with an in-memory map
+AUTH_SESSION_MODE = os.getenv("AUTH_SESSION_MODE", "session")
+
+# Verified JWT claims are cached until the token's exp so repeat tokens skip crypto
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "100000"))
+token_cache = TokenClaimsCache(max_entries=TOKEN_CACHE_MAX_ENTRIES)
+
+# Google sign-in: ID tokens are verified against Google's public keys, cached
+# in memory and in GOOGLE_JWKS_CACHE_FILE. GOOGLE_JWKS_FILE pins a local key
+# set (offline/tests). GOOGLE_CLIENT_IDS lists the accepted audiences of Google
+# ID tokens; FIREBASE_PROJECT_ID accepts Firebase ID tokens of that project
+# (keys from FIREBASE_JWKS_URL, or FIREBASE_JWKS_FILE offline). A token that is
+# sent while neither is set is rejected, not ignored.
+GOOGLE_CLIENT_IDS = [c.strip() for c in os.getenv("GOOGLE_CLIENT_IDS", "").split(",") if c.strip()]
+GOOGLE_TOKEN_ISSUERS = [i.strip() for i in os.getenv("GOOGLE_TOKEN_ISSUERS", ",".join(DEFAULT_ISSUERS)).split(",") if i.strip()]
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID") or None
+GOOGLE_ID_TOKEN_REQUIRED = os.getenv("GOOGLE_ID_TOKEN_REQUIRED", "false").lower() == "true"
+if GOOGLE_ID_TOKEN_REQUIRED and not (GOOGLE_CLIENT_IDS or FIREBASE_PROJECT_ID):
+    raise RuntimeError("GOOGLE_ID_TOKEN_REQUIRED needs GOOGLE_CLIENT_IDS or FIREBASE_PROJECT_ID (the accepted token audiences)")
+google_key_set = GoogleKeySet(
+    jwks_url=os.getenv("GOOGLE_JWKS_URL", DEFAULT_JWKS_URL),
+    cache_file=os.getenv("GOOGLE_JWKS_CACHE_FILE", os.path.join("cache", "google_jwks.json")),
+    local_file=os.getenv("GOOGLE_JWKS_FILE") or None
+)
+firebase_key_set = GoogleKeySet(
+    jwks_url=os.getenv("FIREBASE_JWKS_URL", FIREBASE_JWKS_URL),
+    cache_file=os.getenv("FIREBASE_JWKS_CACHE_FILE", os.path.join("cache", "firebase_jwks.json")),
+    local_file=os.getenv("FIREBASE_JWKS_FILE") or None
+)
+google_token_verifier = GoogleTokenVerifier(
+    google_key_set,
+    audiences=GOOGLE_CLIENT_IDS,
+    issuers=GOOGLE_TOKEN_ISSUERS,
+    firebase_project_id=FIREBASE_PROJECT_ID,
+    firebase_key_set=firebase_key_set
+)
+
+# Password hashing runs on a bounded pool so bcrypt never blocks the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+password_hasher = PasswordHasher(pwd_context, max_workers=PASSWORD_HASH_WORKERS)
+
+# last_activity touches are batched and written every few seconds
+SESSION_ACTIVITY_FLUSH_SECONDS = float(os.getenv("SESSION_ACTIVITY_FLUSH_SECONDS", "5"))
+activity_buffer = SessionActivityBuffer(db.user_sessions, interval_seconds=SESSION_ACTIVITY_FLUSH_SECONDS)
+
 # Razorpay credentials (set these as environment variables in deployment)
 # RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID") // rzp_live_RD1TqHaORLWnO5
 # RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET") // R3KcI2buGSQyuD5SvM5GT6hk
@@ -151,24 +227,29 @@ def fetch_razorpay_status(payment_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to fetch payment status: {str(e)}")
 
 # Helper Functions
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def create_jwt_token(user_id: str, session_id: str) -> str:
+def create_jwt_token(user_id: str, session_id: str, generation: Optional[int] = None) -> str:
     payload = {
         "user_id": user_id,
         "session_id": session_id,
         "exp": datetime.utcnow() + timedelta(days=30)
     }
+    if generation is not None:
+        payload["gen"] = generation
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 def verify_jwt_token(token: str) -> dict:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return {
+        token_data = {
             "user_id": payload.get("user_id"),
-            "session_id": payload.get("session_id")
+            "session_id": payload.get("session_id"),
+            "generation": payload.get("gen")
         }
+        token_cache.put(token, token_data, payload.get("exp"))
+        return token_data
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -176,15 +257,12 @@ def verify_jwt_token(token: str) -> dict:
 
 async def verify_google_token(id_token: str) -> dict:
     """
-    Verify Google ID token (optional - for additional security)
-    This function can be used to verify the Google ID token on the server side
+    Verify a Google ID token (signature, expiry, issuer and audience) against
+    Google's cached public key set and return its claims
     """
     try:
-        # For now, we'll just return a placeholder
-        # In production, you should verify the token with Google's servers
-        # You can use the google-auth library for this
-        return {"verified": True, "user_id": "placeholder"}
-    except Exception as e:
+        return await google_token_verifier.verify(id_token)
+    except GoogleTokenError as e:
         raise HTTPException(status_code=401, detail=f"Google token verification failed: {str(e)}")
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -199,78 +277,268 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if not session_id:
         raise HTTPException(status_code=401, detail="Please login again - session required")
     
+    # Stateless mode: the token is valid while its generation is the user's current one
+    if AUTH_SESSION_MODE == "generation":
+        token_generation = token_data.get("generation")
+        if token_generation is None:
+            raise HTTPException(status_code=401, detail="Please login again - session required")
+        current_generation = await session_generations.current(user_id)
+        if current_generation is not None and token_generation > current_generation:
+            # Issued after this worker cached the generation (e.g. a login handled
+            # by another worker whose bump hasn't reached us yet): reload it
+            session_generations.forget(user_id)
+            current_generation = await session_generations.current(user_id)
+        if current_generation != token_generation:
+            raise HTTPException(status_code=401, detail="Session expired or invalid - logged in from another device")
+        activity_buffer.touch(user_id, session_id)
+        return user_id
+    
+    # Warm path: session was validated recently, no database work needed
+    if session_cache.get(user_id, session_id) is not None:
+        activity_buffer.touch(user_id, session_id)
+        return user_id
+    
     # Validate session is still active
-    session = await db.user_sessions.find_one({
-        "user_id": ObjectId(user_id),
-        "session_id": session_id,
-        "is_active": True
-    })
+    session = await session_store.find_active(user_id, session_id)
     
     if not session:
         raise HTTPException(status_code=401, detail="Session expired or invalid - logged in from another device")
     
-    # Update last activity
-    await db.user_sessions.update_one(
-        {"user_id": ObjectId(user_id), "session_id": session_id},
-        {"$set": {"last_activity": datetime.utcnow()}}
-    )
+    # Update last activity (written in batches by the activity buffer)
+    activity_buffer.touch(user_id, session_id)
+    session_cache.put(user_id, session_id)
     
     return user_id
 
 # Session Management Functions
-async def create_user_session(user_id: str, device_info: dict = None) -> str:
-    """Create a new user session and invalidate previous sessions"""
-    import uuid
-    
-    # Generate unique session ID
-    session_id = str(uuid.uuid4())
-    
-    # Count existing active sessions before invalidation
-    existing_sessions = await db.user_sessions.count_documents({
-        "user_id": ObjectId(user_id),
-        "is_active": True
-    })
-    
-    print(f"🔐 User {user_id} login: Found {existing_sessions} existing active sessions")
-    
-    # Invalidate all previous sessions for this user
-    result = await db.user_sessions.update_many(
-        {"user_id": ObjectId(user_id)},
-        {"$set": {"is_active": False, "ended_at": datetime.utcnow()}}
+# Ended sessions are archived into user_session_summaries after SESSION_ARCHIVE_AFTER_DAYS;
+# the TTL index deletes any that are still around after SESSION_TTL_DAYS.
+SESSION_ARCHIVE_AFTER_DAYS = float(os.getenv("SESSION_ARCHIVE_AFTER_DAYS", "7"))
+SESSION_TTL_DAYS = float(os.getenv("SESSION_TTL_DAYS", "30"))
+SESSION_COMPACTION_INTERVAL_SECONDS = float(os.getenv("SESSION_COMPACTION_INTERVAL_SECONDS", "3600"))
+session_store = SessionStore(
+    db.users,
+    db.user_sessions,
+    summaries=db.user_session_summaries
+)
+
+async def load_session_generation(user_id: str) -> Optional[int]:
+    """Read a user's current session generation (0 for users that never had one)"""
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, {"session_generation": 1})
+    if not user:
+        return None
+    return user.get("session_generation", 0)
+
+session_generations = SessionGenerationMap(
+    load_session_generation,
+    ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+    max_entries=SESSION_CACHE_MAX_ENTRIES
+)
+
+# Cross-worker cache invalidation. "user_sessions" events drop a user's cached
+# sessions and generation, "users" events drop cached profiles, "content"
+# events drop content derived from a collection and "content_versions" events
+# carry a collection's new shared content version ("<collection>:<version>").
+# With change streams, "content_change" events ("<collection>:<cluster time>")
+# report every content write, including those made outside the API.
+# INVALIDATION_BUS: changestream (needs a replica set), unix (workers on one host),
+# auto (change stream, falling back to unix) or none (single worker).
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "auto").lower()
+INVALIDATION_BUS_DIR = os.getenv(
+    "INVALIDATION_BUS_DIR",
+    os.path.join(tempfile.gettempdir(), f"{DATABASE_NAME}-invalidation")
+)
+invalidation_bus = InvalidationBus()
+
+def drop_cached_sessions(user_id: str):
+    session_cache.invalidate_user(user_id)
+    session_generations.forget(user_id)
+
+invalidation_bus.subscribe("user_sessions", drop_cached_sessions)
+invalidation_bus.subscribe("users", session_cache.forget_profiles)
+
+# Collections whose writes invalidate cached content derived from them:
+# CONTENT_COLLECTIONS are served through content_cache, CATALOG_COLLECTIONS are
+# revalidated with ETags built from their content version. The COUNTER_FIELDS
+# popularity counters change on nearly every view, so their increments move the
+# version at most once per COUNTER_VERSION_INTERVAL_SECONDS (counter_changed):
+# cached and revalidated bodies show counts at most that old.
+CONTENT_COLLECTIONS = [
+    "carousel", "youtube_videos", "text_slider", "testimonials", "contacts", "terms_conditions", "institutions"
+]
+CATALOG_COLLECTIONS = ["courses", "materials", "online_tests", "current_affairs"]
+COUNTER_FIELDS = ["download_count", "view_count", "enrolled_students"]
+COUNTER_VERSION_INTERVAL_SECONDS = float(os.getenv("COUNTER_VERSION_INTERVAL_SECONDS", "60"))
+content_versions = ContentVersions(db.content_versions)
+invalidation_bus.subscribe("content_versions", content_versions.on_version)
+
+# Read-through cache of the GET responses of CONTENT_COLLECTIONS, emptied per
+# collection by content_changed (GET /debug/content-cache for hit ratios)
+CONTENT_CACHE_ENABLED = os.getenv("CONTENT_CACHE_ENABLED", "true").lower() == "true"
+CONTENT_CACHE_MAX_ENTRIES = int(os.getenv("CONTENT_CACHE_MAX_ENTRIES", "1000"))
+CONTENT_CACHE_MAX_MB = int(os.getenv("CONTENT_CACHE_MAX_MB", "16"))
+CONTENT_CACHE_TTL_SECONDS = {
+    "carousel": 600,
+    "youtube_videos": 600,
+    "text_slider": 600,
+    "testimonials": 600,
+    "contacts": 3600,
+    "terms_conditions": 3600,
+    "institutions": 3600
+}
+content_cache = ContentCache(
+    CONTENT_CACHE_TTL_SECONDS,
+    max_entries=CONTENT_CACHE_MAX_ENTRIES,
+    max_bytes=CONTENT_CACHE_MAX_MB * 1024 * 1024,
+    enabled=CONTENT_CACHE_ENABLED
+)
+invalidation_bus.subscribe("content", content_cache.invalidate)
+
+async def content_changed(collection: str):
+    """Await after every write to one of CONTENT_COLLECTIONS or CATALOG_COLLECTIONS"""
+    try:
+        version = await content_versions.bump(collection)
+        invalidation_bus.publish("content_versions", f"{collection}:{version}")
+    except Exception as e:
+        print(f"[content] version bump for {collection} failed: {str(e)}")
+    invalidation_bus.publish("content", collection)
+
+pending_counter_bumps: Dict[str, asyncio.Task] = {}
+
+async def counter_changed(collection: str):
+    """Await after incrementing one of the COUNTER_FIELDS of a CATALOG_COLLECTIONS document"""
+    if COUNTER_VERSION_INTERVAL_SECONDS <= 0:
+        await content_changed(collection)
+    elif collection not in pending_counter_bumps:
+        pending_counter_bumps[collection] = asyncio.create_task(bump_counters_later(collection))
+
+async def bump_counters_later(collection: str):
+    try:
+        await asyncio.sleep(COUNTER_VERSION_INTERVAL_SECONDS)
+    finally:
+        pending_counter_bumps.pop(collection, None)
+    await content_changed(collection)
+
+def on_content_change(key: str):
+    """A content write seen on the change stream: drop derived content and bump the version once"""
+    invalidation_bus.dispatch("content", key.split(":", 1)[0])
+    content_versions.on_change(key)
+
+invalidation_bus.subscribe("content_change", on_content_change)
+
+def build_change_stream_transport() -> ChangeStreamTransport:
+    transport = ChangeStreamTransport()
+    # Logins insert a session; logouts and takeovers flip is_active
+    transport.watch(
+        db.user_sessions,
+        "user_sessions",
+        [{"$match": {"$or": [
+            {"operationType": "insert"},
+            {"operationType": "update", "updateDescription.updatedFields.is_active": {"$exists": True}}
+        ]}}],
+        lambda change: str(change["fullDocument"]["user_id"]) if change.get("fullDocument") else None,
+        full_document="updateLookup"
     )
+    transport.watch(
+        db.users,
+        "users",
+        [{"$match": {"operationType": {"$in": ["update", "replace"]}}}],
+        lambda change: str(change["documentKey"]["_id"])
+    )
+    transport.watch(
+        db.users,
+        "user_sessions",
+        [{"$match": {"operationType": "delete"}}],
+        lambda change: str(change["documentKey"]["_id"])
+    )
+    # One database-level stream; also sees content edited outside the API
+    transport.watch(
+        db,
+        "content_change",
+        [{"$match": {
+            "ns.coll": {"$in": CONTENT_COLLECTIONS + CATALOG_COLLECTIONS},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+            # Skip updates that only touched COUNTER_FIELDS
+            "$or": [
+                {"operationType": {"$ne": "update"}},
+                {"$expr": {"$gt": [
+                    {"$size": {"$setDifference": [
+                        {"$map": {"input": {"$objectToArray": "$updateDescription.updatedFields"}, "in": "$$this.k"}},
+                        COUNTER_FIELDS
+                    ]}},
+                    0
+                ]}}
+            ]
+        }}],
+        lambda change: f'{change["ns"]["coll"]}:{change["clusterTime"].time}:{change["clusterTime"].inc}'
+    )
+    # Shared content versions, bumped by content_changed on any worker
+    transport.watch(
+        db.content_versions,
+        "content_versions",
+        [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+        lambda change: (
+            f'{change["documentKey"]["_id"]}:{change["fullDocument"]["version"]}' if change.get("fullDocument") else None
+        ),
+        full_document="updateLookup"
+    )
+    return transport
+
+async def start_invalidation_bus():
+    if INVALIDATION_BUS in ("changestream", "auto"):
+        try:
+            await invalidation_bus.start(build_change_stream_transport())
+            print("[bus] using MongoDB change streams")
+            return
+        except Exception as e:
+            if INVALIDATION_BUS == "changestream":
+                raise
+            print(f"[bus] change streams unavailable ({str(e)}), falling back to unix sockets")
+    if INVALIDATION_BUS in ("unix", "auto"):
+        await invalidation_bus.start(UnixSocketTransport(INVALIDATION_BUS_DIR))
+        print(f"[bus] using unix sockets in {INVALIDATION_BUS_DIR}")
+
+async def bump_session_generation(user_id: str, expected: Optional[int] = None) -> Optional[int]:
+    """
+    Move a user to a new session generation, invalidating every token issued before.
+    With `expected`, only bump if that is still the current generation.
+    """
+    generation = await session_store.allocate_generation(user_id, expected=expected)
+    invalidation_bus.publish("user_sessions", user_id)
+    if generation is not None:
+        session_generations.set(user_id, generation)
+    return generation
+
+async def create_user_session(user_id: str, device_info: dict = None, user: dict = None, user_updates: dict = None) -> tuple:
+    """
+    Create a new user session and invalidate previous sessions.
+    Returns (session_id, session_generation) for embedding in the JWT.
+
+    Pass the already-loaded `user` document to do the generation bump, any
+    `user_updates` (e.g. last_login) and the session write in one round trip.
+    """
+    if user is not None:
+        session_id, generation = await session_store.login(user, device_info, user_updates)
+    else:
+        generation = await session_store.allocate_generation(user_id, user_updates)
+        if generation is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        session_id = await session_store.open_session(user_id, generation, device_info)
     
-    print(f"🔐 Invalidated {result.modified_count} previous sessions for user {user_id}")
-    
-    # Create new session
-    session_data = {
-        "user_id": ObjectId(user_id),
-        "session_id": session_id,
-        "is_active": True,
-        "device_info": device_info or {},
-        "created_at": datetime.utcnow(),
-        "last_activity": datetime.utcnow(),
-        "ended_at": None
-    }
-    
-    await db.user_sessions.insert_one(session_data)
-    print(f"🔐 Created new session {session_id} for user {user_id}")
+    invalidation_bus.publish("user_sessions", user_id)
+    session_generations.set(user_id, generation)
+    print(f"🔐 Created new session {session_id} for user {user_id} (generation {generation})")
     
-    return session_id
+    return session_id, generation
 
 async def invalidate_user_session(user_id: str, session_id: str):
     """Invalidate a specific user session"""
-    await db.user_sessions.update_one(
-        {
-            "user_id": ObjectId(user_id),
-            "session_id": session_id
-        },
-        {
-            "$set": {
-                "is_active": False,
-                "ended_at": datetime.utcnow()
-            }
-        }
-    )
+    session = await session_store.end_session(user_id, session_id)
+    # Retire the generation too, unless a newer login already replaced it (publishes either way)
+    if session and session.get("session_generation") is not None:
+        await bump_session_generation(user_id, expected=session["session_generation"])
+    else:
+        invalidation_bus.publish("user_sessions", user_id)
 
 def serialize_object(obj):
     if isinstance(obj, ObjectId):
@@ -283,6 +551,63 @@ def serialize_object(obj):
         return [serialize_object(item) for item in obj]
     return obj
 
+# Read-only catalog lists can skip building dicts: documents are fetched as
+# RawBSONDocument and converted BSON -> JSON by python-bsonjs. This lowers peak
+# memory (~45% on 10k materials) but costs more CPU than decoding + orjson (see
+# scripts/bench_json_response.py), so it is opt-in: RAW_BSON_LISTS=on.
+RAW_BSON_LISTS_ENABLED = os.getenv("RAW_BSON_LISTS", "off").lower() in ("1", "true", "yes", "on")
+
+# Catalog lists: newest first, keyset-paginated on _id, which every document
+# has and which grows with inserts, so pages stay stable while documents are added
+CATALOG_LIST_SORT = [("_id", DESCENDING)]
+CATALOG_LIST_DEFAULT_LIMIT = 50
+CATALOG_LIST_MAX_LIMIT = 500
+
+async def catalog_list_response(
+    collection,
+    key: str,
+    pipeline: Optional[list] = None,
+    projection: Optional[dict] = None,
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None
+) -> Response:
+    """
+    {key: [documents], "next_cursor": ...} for one page of a collection in
+    CATALOG_LIST_SORT order, optionally through an aggregation pipeline and
+    narrowed to `projection`. Pass next_cursor back as `cursor` for the
+    following page; it is null on the last one.
+    """
+    limit = max(1, min(limit, CATALOG_LIST_MAX_LIMIT))
+    try:
+        query = page_filter({}, CATALOG_LIST_SORT, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    projection = page_projection(projection, CATALOG_LIST_SORT)
+    if RAW_BSON_LISTS_ENABLED:
+        collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+    if pipeline:
+        stages = [{"$match": query}, {"$sort": dict(CATALOG_LIST_SORT)}, {"$limit": limit + 1}, *pipeline]
+        if projection:
+            stages.append({"$project": projection})
+        results = collection.aggregate(stages)
+    else:
+        results = collection.find(query, projection).sort(CATALOG_LIST_SORT).limit(limit + 1)
+    documents, next_cursor = split_page(await results.to_list(limit + 1), CATALOG_LIST_SORT, limit)
+    if RAW_BSON_LISTS_ENABLED:
+        body = raw_list_body(key, documents, {"next_cursor": next_cursor})
+        return Response(content=body, media_type="application/json")
+    return FastJSONResponse({key: documents, "next_cursor": next_cursor})
+
+async def cached_json(collection: str, key: str, build: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[Response]:
+    """
+    JSON response for a GET on one of CONTENT_COLLECTIONS through content_cache;
+    `build` encodes the body, or returns None for not found (not cached)
+    """
+    body = await content_cache.get_or_load(collection, key, build)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
 # Background task for payment status polling
 async def poll_payment_status():
     """
@@ -350,6 +675,22 @@ async def poll_payment_status():
             print(f"Error in payment polling: {str(e)}")
             await asyncio.sleep(60)  # Wait 1 minute on error
 
+# Background task for user_sessions compaction
+async def compact_user_sessions():
+    """
+    Background task that periodically archives ended sessions into compact
+    per-user summaries so user_sessions only holds the hot working set.
+    """
+    while True:
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=SESSION_ARCHIVE_AFTER_DAYS)
+            archived = await session_store.compact_ended_sessions(cutoff)
+            if archived:
+                print(f"[sessions] archived {archived} ended sessions older than {cutoff.isoformat()}")
+        except Exception as e:
+            print(f"Error in session compaction: {str(e)}")
+        await asyncio.sleep(SESSION_COMPACTION_INTERVAL_SECONDS)
+
 # Pydantic Models
 class UserRegistration(BaseModel):
     name: str
@@ -499,6 +840,109 @@ async def save_file(file: UploadFile, folder: str) -> str:
         shutil.copyfileobj(file.file, buffer)
     return file_path
 
+# =============== MIDDLEWARE ===============
+
+# Rate limiting for brute-force and scraping targets. "memory" keeps buckets
+# per process; "mongo" shares them across uvicorn workers via db.rate_limits.
+# RATE_LIMIT_TRUSTED_PROXIES is the number of proxies/load balancers in front of
+# the app; leave it at 0 and every client behind them shares one IP bucket.
+# RATE_LIMIT_TRUST_FORWARDED_FOR=true is the older spelling of one proxy.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1" if RATE_LIMIT_TRUST_FORWARDED_FOR else "0"))
+RATE_LIMIT_POLICIES = [
+    # Students often share a school/NAT address, so per-IP login limits stay generous
+    RateLimitPolicy("login", r"^/auth/login$", rate=1.0, burst=60, methods=("POST",)),
+    RateLimitPolicy("google", r"^/auth/google$", rate=1.0, burst=60, methods=("POST",)),
+    RateLimitPolicy("user-by-email", r"^/users/email/[^/]+$", rate=0.5, burst=20, methods=("GET",), keys=("ip", "user")),
+    RateLimitPolicy("search", r"^/search/", rate=2.0, burst=30, methods=("GET",), keys=("ip", "user")),
+]
+
+if RATE_LIMIT_BACKEND == "mongo":
+    rate_limiter = MongoRateLimiter(db.rate_limits)
+else:
+    rate_limiter = InMemoryRateLimiter()
+
+def rate_limit_user(token: str) -> Optional[str]:
+    """Resolve the user_id of a bearer token for per-user buckets (no DB access)"""
+    try:
+        return verify_jwt_token(token).get("user_id")
+    except HTTPException:
+        return None
+
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        policies=RATE_LIMIT_POLICIES,
+        user_resolver=rate_limit_user,
+        trusted_proxies=RATE_LIMIT_TRUSTED_PROXIES,
+    )
+
+# N+1 detection: flag requests repeating one query shape more than N_PLUS_ONE_THRESHOLD
+# times. N_PLUS_ONE_MODE: warn (log), raise (tests/CI) or off.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+N_PLUS_ONE_MODE = os.getenv("N_PLUS_ONE_MODE", "warn").lower()
+
+# Outside the rate limiter so shared-bucket commands count towards the route
+if QUERY_MONITOR_ENABLED:
+    if N_PLUS_ONE_MODE != "off":
+        app.add_middleware(
+            NPlusOneMiddleware,
+            threshold=N_PLUS_ONE_THRESHOLD,
+            raise_errors=N_PLUS_ONE_MODE == "raise",
+        )
+    app.add_middleware(QueryMonitorMiddleware, monitor=query_monitor)
+
+# gzip/brotli for text and JSON bodies of at least COMPRESSION_MIN_SIZE bytes
+# (brotli needs the optional Brotli package). Compressed catalog lists and the
+# home bundle are kept in compressed_catalog_cache per URL and content version
+# of the collections they are built from, and served without running the route.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_BROTLI = os.getenv("COMPRESSION_BROTLI", "true").lower() == "true"
+COMPRESSION_CACHE_MB = int(os.getenv("COMPRESSION_CACHE_MB", "32"))
+COMPRESSION_CACHE_TTL_SECONDS = int(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "300"))
+COMPRESSION_CACHE_PATHS = r"^/(courses|materials|tests|current-affairs|testimonials|home)$"
+COMPRESSION_CACHE_COLLECTIONS = {
+    "/courses": ("courses",),
+    "/materials": ("materials",),
+    "/tests": ("online_tests",),
+    "/current-affairs": ("current_affairs",),
+    "/testimonials": ("testimonials",),
+}
+
+def compression_cache_version(path: str) -> Optional[str]:
+    collections = HOME_COLLECTIONS if path == "/home" else COMPRESSION_CACHE_COLLECTIONS.get(path)
+    if collections is None:
+        return None
+    return repr(content_versions.snapshot(collections))
+
+compressed_catalog_cache = CompressedBodyCache(
+    max_bytes=COMPRESSION_CACHE_MB * 1024 * 1024,
+    ttl_seconds=COMPRESSION_CACHE_TTL_SECONDS
+)
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        brotli_enabled=COMPRESSION_BROTLI,
+        cache=compressed_catalog_cache,
+        cache_paths=COMPRESSION_CACHE_PATHS,
+        cache_version=compression_cache_version,
+    )
+
+# CORS (added last so it wraps everything, including 429 responses)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 # =============== USER AUTHENTICATION ROUTES ===============
 
 @app.post("/auth/register")
@@ -511,9 +955,10 @@ async def register_user(user_data: UserRegistration):
     # Create user
     user_dict = {
         **user_data.dict(),
-        "password": hash_password(user_data.password),
+        "password": await password_hasher.hash(user_data.password),
         "dob": datetime.fromisoformat(user_data.dob.replace('Z', '+00:00')),
         "is_active": True,
+        "session_generation": 0,
         "last_login": datetime.utcnow(),
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
@@ -522,8 +967,8 @@ async def register_user(user_data: UserRegistration):
     result = await db.users.insert_one(user_dict)
     
     # Create new session for this user
-    session_id = await create_user_session(str(result.inserted_id))
-    token = create_jwt_token(str(result.inserted_id), session_id)
+    session_id, generation = await create_user_session(str(result.inserted_id), user=user_dict)
+    token = create_jwt_token(str(result.inserted_id), session_id, generation)
     
     return {
         "message": "User registered successfully",
@@ -534,18 +979,22 @@ async def register_user(user_data: UserRegistration):
 @app.post("/auth/login")
 async def login_user(login_data: UserLogin):
     user = await db.users.find_one({"email": login_data.email})
-    if not user or user["password"] != hash_password(login_data.password):
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, needs_rehash = await password_hasher.verify(login_data.password, user.get("password"))
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    # Update last login
-    await db.users.update_one(
-        {"_id": user["_id"]},
-        {"$set": {"last_login": datetime.utcnow()}}
-    )
+    # Update last login, upgrading legacy SHA-256 hashes while we have the plain password
+    update_data = {"last_login": datetime.utcnow()}
+    if needs_rehash:
+        update_data["password"] = await password_hasher.hash(login_data.password)
     
-    # Create new session (this will invalidate previous sessions)
-    session_id = await create_user_session(str(user["_id"]))
-    token = create_jwt_token(str(user["_id"]), session_id)
+    # Create new session (this will invalidate previous sessions); the
+    # last_login update is written in the same round trip
+    session_id, generation = await create_user_session(str(user["_id"]), user=user, user_updates=update_data)
+    user.update(update_data)
+    token = create_jwt_token(str(user["_id"]), session_id, generation)
     
     return {
         "message": "Login successful",
@@ -556,51 +1005,61 @@ async def login_user(login_data: UserLogin):
 
 @app.post("/auth/google")
 async def google_auth(google_data: GoogleAuth):
+    # Verify the ID token when the client sends one (required if GOOGLE_ID_TOKEN_REQUIRED);
+    # a verified token decides which account this is, not the posted firebase_uid.
+    # The sub of a Firebase token is the Firebase UID, that of a Google token goes to google_sub.
+    firebase_uid = google_data.firebase_uid
+    google_sub = None
+    user_filter = {"email": google_data.email}
+    if google_data.id_token:
+        claims = await verify_google_token(google_data.id_token)
+        if claims["email"].lower() != google_data.email.lower():
+            raise HTTPException(status_code=401, detail="Google token does not match email")
+        if google_token_verifier.is_firebase(claims):
+            firebase_uid = claims["sub"]
+            user_filter = {"$or": [{"email": google_data.email}, {"firebase_uid": firebase_uid}]}
+        else:
+            google_sub = claims["sub"]
+            user_filter = {"$or": [{"email": google_data.email}, {"google_sub": google_sub}]}
+    elif GOOGLE_ID_TOKEN_REQUIRED:
+        raise HTTPException(status_code=401, detail="Google ID token is required")
+    
     try:
-        # Check if user exists by email or firebase_uid
-        existing_user = await db.users.find_one({
-            "$or": [
-                {"email": google_data.email},
-                {"firebase_uid": google_data.firebase_uid}
-            ]
-        })
+        # Update an existing user and get the updated document back
+        update_data = {
+            "firebase_uid": firebase_uid,
+            "google_sub": google_sub,
+            "name": google_data.name,
+            "photo_url": google_data.photo_url,
+            "provider": google_data.provider,
+            "last_login": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
         
-        if existing_user:
-            # User exists, update their information and login
-            update_data = {
-                "firebase_uid": google_data.firebase_uid,
-                "name": google_data.name,
-                "photo_url": google_data.photo_url,
-                "provider": google_data.provider,
-                "last_login": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            
-            # Only update fields that are not empty
-            update_data = {k: v for k, v in update_data.items() if v is not None}
-            
-            await db.users.update_one(
-                {"_id": existing_user["_id"]},
-                {"$set": update_data}
-            )
-            
-            # Get updated user data
-            updated_user = await db.users.find_one({"_id": existing_user["_id"]})
-            
+        # Only update fields that are not empty
+        update_data = {k: v for k, v in update_data.items() if v is not None}
+        
+        updated_user = await db.users.find_one_and_update(
+            user_filter,
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        if updated_user:
             # Create new session (this will invalidate previous sessions)
-            session_id = await create_user_session(str(existing_user["_id"]))
-            token = create_jwt_token(str(existing_user["_id"]), session_id)
+            session_id, generation = await create_user_session(str(updated_user["_id"]), user=updated_user)
+            token = create_jwt_token(str(updated_user["_id"]), session_id, generation)
             
             return {
                 "message": "Google authentication successful",
-                "user_id": str(existing_user["_id"]),
+                "user_id": str(updated_user["_id"]),
                 "token": token,
                 "user": serialize_object(updated_user)
             }
         else:
             # New user, create account with Google data
             user_dict = {
-                "firebase_uid": google_data.firebase_uid,
+                "firebase_uid": firebase_uid,
                 "name": google_data.name,
                 "email": google_data.email,
                 "photo_url": google_data.photo_url,
@@ -612,34 +1071,168 @@ async def google_auth(google_data: GoogleAuth):
                 "course": "Select Course",  # Default value
                 "password": None,  # No password for Google users
                 "is_active": True,
+                "session_generation": 0,
                 "last_login": datetime.utcnow(),
                 "created_at": datetime.utcnow(),
                 "updated_at": datetime.utcnow()
             }
+            if google_sub:
+                user_dict["google_sub"] = google_sub
             
             result = await db.users.insert_one(user_dict)
             
             # Create new session for this user
-            session_id = await create_user_session(str(result.inserted_id))
-            token = create_jwt_token(str(result.inserted_id), session_id)
-            
-            # Get the created user data
-            new_user = await db.users.find_one({"_id": result.inserted_id})
+            session_id, generation = await create_user_session(str(result.inserted_id), user=user_dict)
+            token = create_jwt_token(str(result.inserted_id), session_id, generation)
+            user_dict["session_generation"] = generation
             
             return {
                 "message": "Google authentication successful - New user created",
                 "user_id": str(result.inserted_id),
                 "token": token,
-                "user": serialize_object(new_user)
+                "user": serialize_object(user_dict)
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Google authentication failed: {str(e)}")
 
+# Fields returned by the slim /auth/check-session variant
+SLIM_USER_PROJECTION = {
+    "name": 1,
+    "email": 1,
+    "contact_no": 1,
+    "gender": 1,
+    "dob": 1,
+    "education": 1,
+    "course": 1,
+    "photo_url": 1,
+    "provider": 1,
+    "is_active": 1,
+    "updated_at": 1
+}
+
+def user_profile_etag(user_id: str, updated_at) -> str:
+    version = int(updated_at.timestamp() * 1000) if isinstance(updated_at, datetime) else 0
+    return f'"user-{user_id}-{version}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+# Catalog revalidation. List ETags are the collection's shared content version,
+# so they match on every worker (and are left out until the versions are
+# loaded). Detail ETags combine updated_at, the same version (which also moves
+# for counter increments) and the requested projection. They are remembered
+# per version, so while it holds a matching If-None-Match is answered 304
+# without a database read.
+CATALOG_CACHE_CONTROL = "public, no-cache"
+CATALOG_DETAIL_ETAGS_MAX_ENTRIES = 10000
+catalog_detail_etags: "OrderedDict[Tuple[str, str, str], Tuple[int, str]]" = OrderedDict()
+
+def projection_tag(projection: Optional[dict]) -> str:
+    if not projection:
+        return ""
+    return f"-{zlib.crc32(repr(sorted(projection.items())).encode()):08x}"
+
+def catalog_list_etag(collection: str) -> Optional[str]:
+    if not content_versions.loaded:
+        return None
+    return f'"{collection}-{content_versions.get(collection)}"'
+
+def catalog_not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    if etag is not None and etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL})
+    return None
+
+def known_catalog_detail_etag(collection: str, document_id: str, projection: Optional[dict]) -> Optional[str]:
+    known = catalog_detail_etags.get((collection, document_id, projection_tag(projection)))
+    if known is None or known[0] != content_versions.get(collection):
+        return None
+    return known[1]
+
+async def find_catalog_document(collection: str, document_id: str, projection: Optional[dict]):
+    """(document, etag) for a catalog detail route; document is None when not found"""
+    version = content_versions.get(collection)
+    # The ETag needs updated_at whatever the client selected; read it and strip it afterwards
+    query_projection = projection
+    strip_updated_at = False
+    if projection and any(projection.values()):
+        if "updated_at" not in projection:
+            query_projection = {**projection, "updated_at": 1}
+            strip_updated_at = True
+    elif projection and "updated_at" in projection:
+        query_projection = {name: value for name, value in projection.items() if name != "updated_at"} or None
+        strip_updated_at = True
+    document = await db[collection].find_one({"_id": ObjectId(document_id)}, query_projection)
+    if not document:
+        return None, None
+    updated_at = document.get("updated_at")
+    if strip_updated_at:
+        document.pop("updated_at", None)
+    stamp = int(updated_at.timestamp() * 1000) if isinstance(updated_at, datetime) else 0
+    tag = projection_tag(projection)
+    etag = f'"{document_id}-{stamp}-{version}{tag}"'
+    catalog_detail_etags[(collection, document_id, tag)] = (version, etag)
+    catalog_detail_etags.move_to_end((collection, document_id, tag))
+    if len(catalog_detail_etags) > CATALOG_DETAIL_ETAGS_MAX_ENTRIES:
+        catalog_detail_etags.popitem(last=False)
+    return document, etag
+
+def catalog_response(request: Request, content: Any, etag: str) -> Response:
+    return catalog_not_modified(request, etag) or FastJSONResponse(
+        content,
+        headers={"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    )
+
+async def catalog_list_with_etag(request: Request, collection: str, key: str, **kwargs) -> Response:
+    # Read the version first: a write racing the query then yields a newer ETag next time
+    etag = catalog_list_etag(collection)
+    not_modified = catalog_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    response = await catalog_list_response(db[collection], key, **kwargs)
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CATALOG_CACHE_CONTROL
+    return response
+
 @app.get("/auth/check-session")
-async def check_session_validity(current_user_id: str = Depends(get_current_user)):
-    """Check if current session is valid - used for app startup validation"""
+async def check_session_validity(
+    request: Request,
+    slim: bool = False,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Check if current session is valid - used for app startup validation.
+    With ?slim=true only profile fields are returned, with an ETag; the profile
+    is cached next to the session so a warm check does no database work.
+    """
     try:
+        if slim:
+            session_id = verify_jwt_token(credentials.credentials).get("session_id")
+            entry = session_cache.get(current_user_id, session_id) or session_cache.put(current_user_id, session_id)
+            profile = entry.get("profile")
+            if profile is None:
+                user = await db.users.find_one({"_id": ObjectId(current_user_id)}, SLIM_USER_PROJECTION)
+                if not user:
+                    raise HTTPException(status_code=404, detail="User not found")
+                profile = entry["profile"] = {
+                    "etag": user_profile_etag(current_user_id, user.get("updated_at")),
+                    "user": serialize_object(user)
+                }
+            
+            headers = {"ETag": profile["etag"], "Cache-Control": "private, no-cache"}
+            if etag_matches(request, profile["etag"]):
+                return Response(status_code=304, headers=headers)
+            response_body = {"valid": True, "message": "Session is active", "user": profile["user"]}
+            return JSONResponse(response_body, headers=headers)
+        
         # If we reach here, the session is valid (get_current_user validates it)
         user = await db.users.find_one({"_id": ObjectId(current_user_id)})
         if not user:
@@ -663,10 +1256,8 @@ async def logout_user(current_user_id: str = Depends(get_current_user)):
         # Get current session info from token
         # Note: We need to extract session_id from the current request
         # For now, we'll invalidate all sessions for this user
-        await db.user_sessions.update_many(
-            {"user_id": ObjectId(current_user_id)},
-            {"$set": {"is_active": False, "ended_at": datetime.utcnow()}}
-        )
+        await session_store.end_user_sessions(current_user_id)
+        await bump_session_generation(current_user_id)
         
         return {"message": "Logged out successfully"}
     except Exception as e:
@@ -704,6 +1295,7 @@ async def link_google_account(link_data: dict, current_user_id: str = Depends(ge
             {"_id": ObjectId(current_user_id)},
             {"$set": update_data}
         )
+        invalidation_bus.publish("users", current_user_id)
         
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -746,8 +1338,9 @@ async def unlink_google_account(current_user_id: str = Depends(get_current_user)
         
         result = await db.users.update_one(
             {"_id": ObjectId(current_user_id)},
-            {"$unset": {"firebase_uid": "", "photo_url": ""}, "$set": {"provider": "email", "updated_at": datetime.utcnow()}}
+            {"$unset": {"firebase_uid": "", "google_sub": "", "photo_url": ""}, "$set": {"provider": "email", "updated_at": datetime.utcnow()}}
         )
+        invalidation_bus.publish("users", current_user_id)
         
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -767,24 +1360,62 @@ async def unlink_google_account(current_user_id: str = Depends(get_current_user)
 
 # =============== USER ROUTES ===============
 
+# /users listing: newest first, keyset-paginated on (created_at, _id)
+USER_LIST_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+USER_LIST_PROJECTION = {
+    **SLIM_USER_PROJECTION,
+    "last_login": 1,
+    "created_at": 1
+}
+USER_LIST_DEFAULT_LIMIT = 50
+USER_LIST_MAX_LIMIT = 500
+
 @app.get("/users")
-async def get_all_users():
-    users = []
-    async for user in db.users.find():
-        users.append(serialize_object(user))
-    return {"users": users}
+async def get_all_users(
+    limit: int = USER_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    course: Optional[str] = None,
+    education: Optional[str] = None,
+    provider: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("users"))
+):
+    """
+    List users a page at a time. Pass the returned `next_cursor` back as
+    `cursor` for the following page; it is null on the last page.
+    """
+    filter_query = {}
+    if course:
+        filter_query["course"] = course
+    if education:
+        filter_query["education"] = education
+    if provider:
+        # Email/password accounts are stored without a provider field
+        filter_query["provider"] = {"$in": [provider, None]} if provider == "email" else provider
+    
+    try:
+        users, next_cursor = await paginate(
+            db.users,
+            filter_query,
+            USER_LIST_SORT,
+            limit=max(1, min(limit, USER_LIST_MAX_LIMIT)),
+            cursor=cursor,
+            projection=narrow_projection(USER_LIST_PROJECTION, projection)
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"users": [serialize_object(user) for user in users], "next_cursor": next_cursor}
 
 @app.get("/users/{user_id}")
-async def get_user(user_id: str):
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+async def get_user(user_id: str, projection: Optional[dict] = Depends(fieldset_projection("users"))):
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, projection)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {"user": serialize_object(user)}
 
 @app.get("/users/email/{email}")
-async def get_user_by_email(email: str):
+async def get_user_by_email(email: str, projection: Optional[dict] = Depends(fieldset_projection("users"))):
     """Check if user exists by email (useful for Google auth)"""
-    user = await db.users.find_one({"email": email})
+    user = await db.users.find_one({"email": email}, projection)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {"user": serialize_object(user)}
@@ -796,6 +1427,7 @@ async def update_user(user_id: str, user_data: dict):
         {"_id": ObjectId(user_id)},
         {"$set": user_data}
     )
+    invalidation_bus.publish("users", user_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User updated successfully"}
@@ -807,7 +1439,7 @@ async def update_user_profile(user_id: str, profile_data: dict, current_user_id:
         raise HTTPException(status_code=403, detail="You can only update your own profile")
     
     # Remove sensitive fields that shouldn't be updated via this endpoint
-    sensitive_fields = ["password", "firebase_uid", "provider", "is_active", "created_at"]
+    sensitive_fields = ["password", "firebase_uid", "google_sub", "provider", "is_active", "created_at"]
     for field in sensitive_fields:
         profile_data.pop(field, None)
     
@@ -817,6 +1449,7 @@ async def update_user_profile(user_id: str, profile_data: dict, current_user_id:
         {"_id": ObjectId(user_id)},
         {"$set": profile_data}
     )
+    invalidation_bus.publish("users", user_id)
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -830,6 +1463,7 @@ async def update_user_profile(user_id: str, profile_data: dict, current_user_id:
 @app.delete("/users/{user_id}")
 async def delete_user(user_id: str):
     result = await db.users.delete_one({"_id": ObjectId(user_id)})
+    invalidation_bus.publish("user_sessions", user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
@@ -844,21 +1478,24 @@ async def create_institution(institution: InstitutionCreate):
         "updated_at": datetime.utcnow()
     }
     result = await db.institutions.insert_one(institution_dict)
+    await content_changed("institutions")
     return {"message": "Institution created", "id": str(result.inserted_id)}
 
 @app.get("/institutions")
-async def get_institutions():
-    institutions = []
-    async for inst in db.institutions.find():
-        institutions.append(serialize_object(inst))
-    return {"institutions": institutions}
+async def get_institutions(projection: Optional[dict] = Depends(fieldset_projection("institutions"))):
+    async def build():
+        return dumps({"institutions": await db.institutions.find({}, projection).to_list(None)})
+    return await cached_json("institutions", f"list:{projection}", build)
 
 @app.get("/institutions/{institution_id}")
-async def get_institution(institution_id: str):
-    institution = await db.institutions.find_one({"_id": ObjectId(institution_id)})
-    if not institution:
+async def get_institution(institution_id: str, projection: Optional[dict] = Depends(fieldset_projection("institutions"))):
+    async def build():
+        institution = await db.institutions.find_one({"_id": ObjectId(institution_id)}, projection)
+        return dumps({"institution": institution}) if institution else None
+    response = await cached_json("institutions", f"{institution_id}:{projection}", build)
+    if response is None:
         raise HTTPException(status_code=404, detail="Institution not found")
-    return {"institution": serialize_object(institution)}
+    return response
 
 @app.put("/institutions/{institution_id}")
 async def update_institution(institution_id: str, institution_data: dict):
@@ -867,6 +1504,7 @@ async def update_institution(institution_id: str, institution_data: dict):
         {"_id": ObjectId(institution_id)},
         {"$set": institution_data}
     )
+    await content_changed("institutions")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Institution not found")
     return {"message": "Institution updated successfully"}
@@ -874,6 +1512,7 @@ async def update_institution(institution_id: str, institution_data: dict):
 @app.delete("/institutions/{institution_id}")
 async def delete_institution(institution_id: str):
     result = await db.institutions.delete_one({"_id": ObjectId(institution_id)})
+    await content_changed("institutions")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Institution not found")
     return {"message": "Institution deleted successfully"}
@@ -912,21 +1551,33 @@ async def create_testimonial(
     }
     
     result = await db.testimonials.insert_one(testimonial_dict)
+    await content_changed("testimonials")
     return {"message": "Testimonial created", "id": str(result.inserted_id)}
 
 @app.get("/testimonials")
-async def get_testimonials():
-    testimonials = []
-    async for test in db.testimonials.find():
-        testimonials.append(serialize_object(test))
-    return {"testimonials": testimonials}
+async def get_testimonials(
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("testimonials"))
+):
+    limit = max(1, min(limit, CATALOG_LIST_MAX_LIMIT))
+    if cursor is not None:
+        # Only first pages are cached: cursors are unbounded and rarely repeat
+        return await catalog_list_response(db.testimonials, "testimonials", projection=projection, limit=limit, cursor=cursor)
+    async def build():
+        response = await catalog_list_response(db.testimonials, "testimonials", projection=projection, limit=limit)
+        return response.body
+    return await cached_json("testimonials", f"list:{limit}:{projection}", build)
 
 @app.get("/testimonials/{testimonial_id}")
-async def get_testimonial(testimonial_id: str):
-    testimonial = await db.testimonials.find_one({"_id": ObjectId(testimonial_id)})
-    if not testimonial:
+async def get_testimonial(testimonial_id: str, projection: Optional[dict] = Depends(fieldset_projection("testimonials"))):
+    async def build():
+        testimonial = await db.testimonials.find_one({"_id": ObjectId(testimonial_id)}, projection)
+        return dumps({"testimonial": testimonial}) if testimonial else None
+    response = await cached_json("testimonials", f"{testimonial_id}:{projection}", build)
+    if response is None:
         raise HTTPException(status_code=404, detail="Testimonial not found")
-    return {"testimonial": serialize_object(testimonial)}
+    return response
 
 @app.put("/testimonials/{testimonial_id}")
 async def update_testimonial(testimonial_id: str, testimonial_data: dict):
@@ -935,6 +1586,7 @@ async def update_testimonial(testimonial_id: str, testimonial_data: dict):
         {"_id": ObjectId(testimonial_id)},
         {"$set": testimonial_data}
     )
+    await content_changed("testimonials")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Testimonial not found")
     return {"message": "Testimonial updated successfully"}
@@ -942,6 +1594,7 @@ async def update_testimonial(testimonial_id: str, testimonial_data: dict):
 @app.delete("/testimonials/{testimonial_id}")
 async def delete_testimonial(testimonial_id: str):
     result = await db.testimonials.delete_one({"_id": ObjectId(testimonial_id)})
+    await content_changed("testimonials")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Testimonial not found")
     return {"message": "Testimonial deleted successfully"}
@@ -984,21 +1637,27 @@ async def create_course(
     }
     
     result = await db.courses.insert_one(course_dict)
+    await content_changed("courses")
     return {"message": "Course created", "id": str(result.inserted_id)}
 
 @app.get("/courses")
-async def get_courses():
-    courses = []
-    async for course in db.courses.find():
-        courses.append(serialize_object(course))
-    return {"courses": courses}
+async def get_courses(
+    request: Request,
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("courses"))
+):
+    return await catalog_list_with_etag(request, "courses", "courses", projection=projection, limit=limit, cursor=cursor)
 
 @app.get("/courses/{course_id}")
-async def get_course(course_id: str):
-    course = await db.courses.find_one({"_id": ObjectId(course_id)})
+async def get_course(request: Request, course_id: str, projection: Optional[dict] = Depends(fieldset_projection("courses"))):
+    not_modified = catalog_not_modified(request, known_catalog_detail_etag("courses", course_id, projection))
+    if not_modified is not None:
+        return not_modified
+    course, etag = await find_catalog_document("courses", course_id, projection)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return {"course": serialize_object(course)}
+    return catalog_response(request, {"course": course}, etag)
 
 @app.put("/courses/{course_id}")
 async def update_course(course_id: str, course_data: dict):
@@ -1007,6 +1666,7 @@ async def update_course(course_id: str, course_data: dict):
         {"_id": ObjectId(course_id)},
         {"$set": course_data}
     )
+    await content_changed("courses")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Course not found")
     return {"message": "Course updated successfully"}
@@ -1014,6 +1674,7 @@ async def update_course(course_id: str, course_data: dict):
 @app.delete("/courses/{course_id}")
 async def delete_course(course_id: str):
     result = await db.courses.delete_one({"_id": ObjectId(course_id)})
+    await content_changed("courses")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Course not found")
     return {"message": "Course deleted successfully"}
@@ -1065,18 +1726,30 @@ async def create_material(
     }
     
     result = await db.materials.insert_one(material_dict)
+    await content_changed("materials")
     return {"message": "Material created", "id": str(result.inserted_id)}
 
 @app.get("/materials")
-async def get_materials():
-    materials = []
-    async for material in db.materials.find():
-        materials.append(serialize_object(material))
-    return {"materials": materials}
+async def get_materials(
+    request: Request,
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("materials"))
+):
+    return await catalog_list_with_etag(request, "materials", "materials", projection=projection, limit=limit, cursor=cursor)
 
 @app.get("/materials/{material_id}")
-async def get_material(material_id: str):
-    material = await db.materials.find_one({"_id": ObjectId(material_id)})
+async def get_material(request: Request, material_id: str, projection: Optional[dict] = Depends(fieldset_projection("materials"))):
+    not_modified = catalog_not_modified(request, known_catalog_detail_etag("materials", material_id, projection))
+    if not_modified is not None:
+        # A revalidated view is still a view
+        await db.materials.update_one(
+            {"_id": ObjectId(material_id)},
+            {"$inc": {"download_count": 1}}
+        )
+        await counter_changed("materials")
+        return not_modified
+    material, etag = await find_catalog_document("materials", material_id, projection)
     if not material:
         raise HTTPException(status_code=404, detail="Material not found")
     
@@ -1085,8 +1758,9 @@ async def get_material(material_id: str):
         {"_id": ObjectId(material_id)},
         {"$inc": {"download_count": 1}}
     )
+    await counter_changed("materials")
     
-    return {"material": serialize_object(material)}
+    return catalog_response(request, {"material": material}, etag)
 
 @app.put("/materials/{material_id}")
 async def update_material(material_id: str, material_data: dict):
@@ -1095,6 +1769,7 @@ async def update_material(material_id: str, material_data: dict):
         {"_id": ObjectId(material_id)},
         {"$set": material_data}
     )
+    await content_changed("materials")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Material not found")
     return {"message": "Material updated successfully"}
@@ -1102,6 +1777,7 @@ async def update_material(material_id: str, material_data: dict):
 @app.delete("/materials/{material_id}")
 async def delete_material(material_id: str):
     result = await db.materials.delete_one({"_id": ObjectId(material_id)})
+    await content_changed("materials")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Material not found")
     return {"message": "Material deleted successfully"}
@@ -1124,6 +1800,7 @@ async def create_test(test: OnlineTestCreate):
     }
     
     result = await db.online_tests.insert_one(test_dict)
+    await content_changed("online_tests")
     return {"message": "Test created", "id": str(result.inserted_id)}
 
 class TestWithQuestionsCreate(BaseModel):
@@ -1147,6 +1824,7 @@ async def create_test_with_questions(data: TestWithQuestionsCreate):
     }
     
     test_result = await db.online_tests.insert_one(test_dict)
+    await content_changed("online_tests")
     test_id = str(test_result.inserted_id)
     
     # Create questions
@@ -1168,24 +1846,36 @@ async def create_test_with_questions(data: TestWithQuestionsCreate):
     return {"message": "Test with questions created", "test_id": test_id, "questions_count": len(questions_list)}
 
 @app.get("/tests")
-async def get_tests():
-    tests = []
-    async for test in db.online_tests.find():
-        # Ensure price field exists with default 0 for legacy records
-        if "price" not in test or test.get("price") is None:
-            test["price"] = 0
-        tests.append(serialize_object(test))
-    return {"tests": tests}
+async def get_tests(
+    request: Request,
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("online_tests"))
+):
+    # Ensure price field exists with default 0 for legacy records
+    return await catalog_list_with_etag(
+        request,
+        "online_tests",
+        "tests",
+        pipeline=[{"$addFields": {"price": {"$ifNull": ["$price", 0]}}}],
+        projection=projection,
+        limit=limit,
+        cursor=cursor
+    )
 
 @app.get("/tests/{test_id}")
-async def get_test(test_id: str):
-    test = await db.online_tests.find_one({"_id": ObjectId(test_id)})
+async def get_test(request: Request, test_id: str, projection: Optional[dict] = Depends(fieldset_projection("online_tests"))):
+    not_modified = catalog_not_modified(request, known_catalog_detail_etag("online_tests", test_id, projection))
+    if not_modified is not None:
+        return not_modified
+    test, etag = await find_catalog_document("online_tests", test_id, projection)
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
-    # Ensure price field exists with default 0 for legacy records
-    if "price" not in test or test.get("price") is None:
+    # Ensure price field exists with default 0 for legacy records (unless fields= left it out)
+    price_requested = not projection or projection.get("price", 0 if any(projection.values()) else 1)
+    if price_requested and test.get("price") is None:
         test["price"] = 0
-    return {"test": serialize_object(test)}
+    return catalog_response(request, {"test": test}, etag)
 
 @app.put("/tests/{test_id}")
 async def update_test(test_id: str, test_data: dict):
@@ -1194,6 +1884,7 @@ async def update_test(test_id: str, test_data: dict):
         {"_id": ObjectId(test_id)},
         {"$set": test_data}
     )
+    await content_changed("online_tests")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Test not found")
     return {"message": "Test updated successfully"}
@@ -1201,6 +1892,7 @@ async def update_test(test_id: str, test_data: dict):
 @app.delete("/tests/{test_id}")
 async def delete_test(test_id: str):
     result = await db.online_tests.delete_one({"_id": ObjectId(test_id)})
+    await content_changed("online_tests")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Test not found")
     return {"message": "Test deleted successfully"}
@@ -1263,15 +1955,13 @@ async def create_question(
     return {"message": "Question created", "id": str(result.inserted_id)}
 
 @app.get("/test-questions/test/{test_id}")
-async def get_test_questions(test_id: str):
-    questions = []
-    async for question in db.test_questions.find({"test_id": ObjectId(test_id)}):
-        questions.append(serialize_object(question))
-    return {"questions": questions}
+async def get_test_questions(test_id: str, projection: Optional[dict] = Depends(fieldset_projection("test_questions"))):
+    questions = await db.test_questions.find({"test_id": ObjectId(test_id)}, projection).to_list(None)
+    return FastJSONResponse({"questions": questions})
 
 @app.get("/test-questions/{question_id}")
-async def get_question(question_id: str):
-    question = await db.test_questions.find_one({"_id": ObjectId(question_id)})
+async def get_question(question_id: str, projection: Optional[dict] = Depends(fieldset_projection("test_questions"))):
+    question = await db.test_questions.find_one({"_id": ObjectId(question_id)}, projection)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     return {"question": serialize_object(question)}
@@ -1412,15 +2102,12 @@ async def complete_test_attempt(attempt_id: str):
     return {"message": "Test completed"}
 
 @app.get("/test-attempts/user/{user_id}")
-async def get_user_test_attempts(user_id: str):
-    attempts = []
-    async for attempt in db.user_test_attempts.find({"user_id": ObjectId(user_id)}):
-        attempts.append(serialize_object(attempt))
-    return {"attempts": attempts}
+async def get_user_test_attempts(user_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_test_attempts"))):
+    return await json_array_response("attempts", db.user_test_attempts.find({"user_id": ObjectId(user_id)}, projection))
 
 @app.get("/test-attempts/{attempt_id}")
-async def get_test_attempt(attempt_id: str):
-    attempt = await db.user_test_attempts.find_one({"_id": ObjectId(attempt_id)})
+async def get_test_attempt(attempt_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_test_attempts"))):
+    attempt = await db.user_test_attempts.find_one({"_id": ObjectId(attempt_id)}, projection)
     if not attempt:
         raise HTTPException(status_code=404, detail="Attempt not found")
     return {"attempt": serialize_object(attempt)}
@@ -1442,15 +2129,18 @@ async def create_notification(notification: NotificationCreate):
     return {"message": "Notification created", "id": str(result.inserted_id)}
 
 @app.get("/notifications")
-async def get_notifications():
-    notifications = []
-    async for notif in db.notifications.find():
-        notifications.append(serialize_object(notif))
-    return {"notifications": notifications}
+async def get_notifications(
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("notifications"))
+):
+    return await catalog_list_response(
+        db.notifications, "notifications", projection=projection, limit=limit, cursor=cursor
+    )
 
 @app.get("/notifications/{notification_id}")
-async def get_notification(notification_id: str):
-    notification = await db.notifications.find_one({"_id": ObjectId(notification_id)})
+async def get_notification(notification_id: str, projection: Optional[dict] = Depends(fieldset_projection("notifications"))):
+    notification = await db.notifications.find_one({"_id": ObjectId(notification_id)}, projection)
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     return {"notification": serialize_object(notification)}
@@ -1490,18 +2180,30 @@ async def create_current_affairs(affairs: CurrentAffairsCreate):
     }
     
     result = await db.current_affairs.insert_one(affairs_dict)
+    await content_changed("current_affairs")
     return {"message": "Current affairs created", "id": str(result.inserted_id)}
 
 @app.get("/current-affairs")
-async def get_current_affairs():
-    affairs = []
-    async for affair in db.current_affairs.find():
-        affairs.append(serialize_object(affair))
-    return {"current_affairs": affairs}
+async def get_current_affairs(
+    request: Request,
+    limit: int = CATALOG_LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = Depends(fieldset_projection("current_affairs"))
+):
+    return await catalog_list_with_etag(request, "current_affairs", "current_affairs", projection=projection, limit=limit, cursor=cursor)
 
 @app.get("/current-affairs/{affairs_id}")
-async def get_current_affair(affairs_id: str):
-    affair = await db.current_affairs.find_one({"_id": ObjectId(affairs_id)})
+async def get_current_affair(request: Request, affairs_id: str, projection: Optional[dict] = Depends(fieldset_projection("current_affairs"))):
+    not_modified = catalog_not_modified(request, known_catalog_detail_etag("current_affairs", affairs_id, projection))
+    if not_modified is not None:
+        # A revalidated view is still a view
+        await db.current_affairs.update_one(
+            {"_id": ObjectId(affairs_id)},
+            {"$inc": {"view_count": 1}}
+        )
+        await counter_changed("current_affairs")
+        return not_modified
+    affair, etag = await find_catalog_document("current_affairs", affairs_id, projection)
     if not affair:
         raise HTTPException(status_code=404, detail="Current affairs not found")
     
@@ -1510,8 +2212,9 @@ async def get_current_affair(affairs_id: str):
         {"_id": ObjectId(affairs_id)},
         {"$inc": {"view_count": 1}}
     )
+    await counter_changed("current_affairs")
     
-    return {"current_affairs": serialize_object(affair)}
+    return catalog_response(request, {"current_affairs": affair}, etag)
 
 @app.put("/current-affairs/{affairs_id}")
 async def update_current_affairs(affairs_id: str, affairs_data: dict):
@@ -1520,6 +2223,7 @@ async def update_current_affairs(affairs_id: str, affairs_data: dict):
         {"_id": ObjectId(affairs_id)},
         {"$set": affairs_data}
     )
+    await content_changed("current_affairs")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Current affairs not found")
     return {"message": "Current affairs updated successfully"}
@@ -1527,6 +2231,7 @@ async def update_current_affairs(affairs_id: str, affairs_data: dict):
 @app.delete("/current-affairs/{affairs_id}")
 async def delete_current_affairs(affairs_id: str):
     result = await db.current_affairs.delete_one({"_id": ObjectId(affairs_id)})
+    await content_changed("current_affairs")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Current affairs not found")
     return {"message": "Current affairs deleted successfully"}
@@ -1543,14 +2248,18 @@ async def create_contact(contact_data: dict):
     }
     
     result = await db.contacts.insert_one(contact_dict)
+    await content_changed("contacts")
     return {"message": "Contact info created", "id": str(result.inserted_id)}
 
 @app.get("/contact")
-async def get_contact():
-    contact = await db.contacts.find_one({"is_active": True})
-    if not contact:
+async def get_contact(projection: Optional[dict] = Depends(fieldset_projection("contacts"))):
+    async def build():
+        contact = await db.contacts.find_one({"is_active": True}, projection)
+        return dumps({"contact": contact}) if contact else None
+    response = await cached_json("contacts", f"active:{projection}", build)
+    if response is None:
         raise HTTPException(status_code=404, detail="Contact info not found")
-    return {"contact": serialize_object(contact)}
+    return response
 
 @app.put("/contact/{contact_id}")
 async def update_contact(contact_id: str, contact_data: dict):
@@ -1588,6 +2297,7 @@ async def update_contact(contact_id: str, contact_data: dict):
         {"_id": ObjectId(contact_id)},
         {"$set": cleaned_data}
     )
+    await content_changed("contacts")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Contact not found")
     return {"message": "Contact updated successfully"}
@@ -1608,15 +2318,13 @@ async def create_contact_message(message_data: dict):
     return {"message": "Contact message sent", "id": str(result.inserted_id)}
 
 @app.get("/contact-messages")
-async def get_contact_messages():
-    messages = []
-    async for message in db.user_contact_messages.find():
-        messages.append(serialize_object(message))
-    return {"messages": messages}
+async def get_contact_messages(projection: Optional[dict] = Depends(fieldset_projection("user_contact_messages"))):
+    messages = await db.user_contact_messages.find({}, projection).to_list(None)
+    return FastJSONResponse({"messages": messages})
 
 @app.get("/contact-messages/{message_id}")
-async def get_contact_message(message_id: str):
-    message = await db.user_contact_messages.find_one({"_id": ObjectId(message_id)})
+async def get_contact_message(message_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_contact_messages"))):
+    message = await db.user_contact_messages.find_one({"_id": ObjectId(message_id)}, projection)
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
     return {"message": serialize_object(message)}
@@ -1653,21 +2361,28 @@ async def create_terms_conditions(terms_data: dict):
     }
     
     result = await db.terms_conditions.insert_one(terms_dict)
+    await content_changed("terms_conditions")
     return {"message": "Terms and conditions created", "id": str(result.inserted_id)}
 
 @app.get("/terms-conditions")
-async def get_terms_conditions():
-    terms = await db.terms_conditions.find_one({"is_active": True})
-    if not terms:
+async def get_terms_conditions(projection: Optional[dict] = Depends(fieldset_projection("terms_conditions"))):
+    async def build():
+        terms = await db.terms_conditions.find_one({"is_active": True}, projection)
+        return dumps({"terms": terms}) if terms else None
+    response = await cached_json("terms_conditions", f"active:{projection}", build)
+    if response is None:
         raise HTTPException(status_code=404, detail="Terms and conditions not found")
-    return {"terms": serialize_object(terms)}
+    return response
 
 @app.get("/terms-conditions/{terms_id}")
-async def get_terms_by_id(terms_id: str):
-    terms = await db.terms_conditions.find_one({"_id": ObjectId(terms_id)})
-    if not terms:
+async def get_terms_by_id(terms_id: str, projection: Optional[dict] = Depends(fieldset_projection("terms_conditions"))):
+    async def build():
+        terms = await db.terms_conditions.find_one({"_id": ObjectId(terms_id)}, projection)
+        return dumps({"terms": terms}) if terms else None
+    response = await cached_json("terms_conditions", f"{terms_id}:{projection}", build)
+    if response is None:
         raise HTTPException(status_code=404, detail="Terms and conditions not found")
-    return {"terms": serialize_object(terms)}
+    return response
 
 @app.put("/terms-conditions/{terms_id}")
 async def update_terms_conditions(terms_id: str, terms_data: dict):
@@ -1677,6 +2392,7 @@ async def update_terms_conditions(terms_id: str, terms_data: dict):
         {"_id": ObjectId(terms_id)},
         {"$set": terms_data}
     )
+    await content_changed("terms_conditions")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Terms and conditions not found")
     return {"message": "Terms and conditions updated successfully"}
@@ -1684,6 +2400,7 @@ async def update_terms_conditions(terms_id: str, terms_data: dict):
 @app.delete("/terms-conditions/{terms_id}")
 async def delete_terms_conditions(terms_id: str):
     result = await db.terms_conditions.delete_one({"_id": ObjectId(terms_id)})
+    await content_changed("terms_conditions")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Terms and conditions not found")
     return {"message": "Terms and conditions deleted successfully"}
@@ -1725,22 +2442,18 @@ async def track_download(download_data: dict, user_id: str = Depends(get_current
         {"_id": ObjectId(download_data["material_id"])},
         {"$inc": {"download_count": 1}}
     )
+    await counter_changed("materials")
     
     return {"message": "Download tracked successfully"}
 
 @app.get("/downloads/user/{user_id}")
-async def get_user_downloads(user_id: str):
-    downloads = []
-    async for download in db.user_downloads.find({"user_id": ObjectId(user_id)}):
-        downloads.append(serialize_object(download))
-    return {"downloads": downloads}
+async def get_user_downloads(user_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_downloads"))):
+    downloads = await db.user_downloads.find({"user_id": ObjectId(user_id)}, projection).to_list(None)
+    return FastJSONResponse({"downloads": downloads})
 
 @app.get("/downloads/material/{material_id}")
-async def get_material_downloads(material_id: str):
-    downloads = []
-    async for download in db.user_downloads.find({"material_id": ObjectId(material_id)}):
-        downloads.append(serialize_object(download))
-    return {"downloads": downloads}
+async def get_material_downloads(material_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_downloads"))):
+    return await json_array_response("downloads", db.user_downloads.find({"material_id": ObjectId(material_id)}, projection))
 
 # =============== USER ENROLLMENT ROUTES ===============
 
@@ -1775,26 +2488,22 @@ async def enroll_user_in_course(enrollment_data: dict, user_id: str = Depends(ge
         {"_id": ObjectId(enrollment_data["course_id"])},
         {"$inc": {"enrolled_students": 1}}
     )
+    await counter_changed("courses")
     
     return {"message": "User enrolled successfully", "enrollment_id": str(result.inserted_id)}
 
 @app.get("/enrollments/user/{user_id}")
-async def get_user_enrollments(user_id: str):
-    enrollments = []
-    async for enrollment in db.user_enrollments.find({"user_id": ObjectId(user_id)}):
-        enrollments.append(serialize_object(enrollment))
-    return {"enrollments": enrollments}
+async def get_user_enrollments(user_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_enrollments"))):
+    enrollments = await db.user_enrollments.find({"user_id": ObjectId(user_id)}, projection).to_list(None)
+    return FastJSONResponse({"enrollments": enrollments})
 
 @app.get("/enrollments/course/{course_id}")
-async def get_course_enrollments(course_id: str):
-    enrollments = []
-    async for enrollment in db.user_enrollments.find({"course_id": ObjectId(course_id)}):
-        enrollments.append(serialize_object(enrollment))
-    return {"enrollments": enrollments}
+async def get_course_enrollments(course_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_enrollments"))):
+    return await json_array_response("enrollments", db.user_enrollments.find({"course_id": ObjectId(course_id)}, projection))
 
 @app.get("/enrollments/{enrollment_id}")
-async def get_enrollment(enrollment_id: str):
-    enrollment = await db.user_enrollments.find_one({"_id": ObjectId(enrollment_id)})
+async def get_enrollment(enrollment_id: str, projection: Optional[dict] = Depends(fieldset_projection("user_enrollments"))):
+    enrollment = await db.user_enrollments.find_one({"_id": ObjectId(enrollment_id)}, projection)
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
     return {"enrollment": serialize_object(enrollment)}
@@ -1827,6 +2536,50 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+# Admin routes (exports, cache and query stats) require a matching X-Admin-Token header;
+# they are disabled while ADMIN_EXPORT_TOKEN is unset
+ADMIN_EXPORT_TOKEN = os.getenv("ADMIN_EXPORT_TOKEN", "")
+
+def require_admin_token(request: Request):
+    # No token configured means admin routes are disabled, not open
+    if not ADMIN_EXPORT_TOKEN or not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_EXPORT_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/debug/token-cache", dependencies=[Depends(require_admin_token)])
+async def get_token_cache_stats():
+    """Hit/miss counters of the verified-JWT cache"""
+    return token_cache.stats()
+
+@app.get("/debug/compression", dependencies=[Depends(require_admin_token)])
+async def get_compression_stats():
+    """Size and hit ratio of the compressed catalog body cache"""
+    stats = compressed_catalog_cache.stats()
+    stats["enabled"] = COMPRESSION_ENABLED
+    stats["brotli"] = COMPRESSION_BROTLI and BROTLI_AVAILABLE
+    return stats
+
+@app.get("/debug/content-cache", dependencies=[Depends(require_admin_token)])
+async def get_content_cache_stats():
+    """Hit ratio, evictions and age of served entries of the content cache, per collection"""
+    return content_cache.stats()
+
+@app.post("/debug/content-cache/reset", dependencies=[Depends(require_admin_token)])
+async def reset_content_cache_stats():
+    content_cache.reset_stats()
+    return {"message": "Content cache stats reset"}
+
+@app.get("/debug/queries", dependencies=[Depends(require_admin_token)])
+async def get_query_stats():
+    """MongoDB commands per route and query shape, plus the most recent slow queries"""
+    stats = query_monitor.snapshot()
+    stats["enabled"] = QUERY_MONITOR_ENABLED
+    return stats
+
+@app.post("/debug/queries/reset", dependencies=[Depends(require_admin_token)])
+async def reset_query_stats():
+    query_monitor.reset()
+    return {"message": "Query stats reset"}
+
 # =============== DASHBOARD & ANALYTICS ROUTES ===============
 
 @app.get("/dashboard/stats")
@@ -1868,6 +2621,116 @@ async def get_recent_activities():
         "recent_test_attempts": recent_test_attempts
     }
 
+# =============== ADMIN EXPORT ROUTES ===============
+
+def export_object_id(value: str):
+    if not ObjectId.is_valid(value):
+        raise ValueError(f"invalid id: {value}")
+    return ObjectId(value)
+
+def export_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+# Per collection: default columns, columns that may never be exported, and
+# the query parameters accepted as equality filters (with their converters)
+EXPORT_COLLECTIONS = {
+    "users": {
+        "collection": db.users,
+        "fields": ["_id", "name", "email", "contact_no", "gender", "dob", "education", "course",
+                   "provider", "is_active", "last_login", "created_at"],
+        "forbidden": ["password", "firebase_uid", "google_sub", "session_generation"],
+        "filters": {"course": str, "education": str, "provider": str, "is_active": export_bool},
+    },
+    "enrollments": {
+        "collection": db.user_enrollments,
+        "fields": ["_id", "user_id", "course_id", "enrollment_date", "status", "progress",
+                   "payment_status", "amount_paid", "certificate_issued", "created_at"],
+        "forbidden": [],
+        "filters": {"user_id": export_object_id, "course_id": export_object_id,
+                    "status": str, "payment_status": str},
+    },
+    "payment_links": {
+        "collection": db.payment_links,
+        "fields": ["_id", "user_id", "product_type", "product_id", "gateway", "amount",
+                   "link_id", "link_url", "status", "created_at", "updated_at"],
+        "forbidden": [],
+        # user_id is stored as an ObjectId when it is a valid one, as given otherwise
+        "filters": {"user_id": lambda value: ObjectId(value) if ObjectId.is_valid(value) else value,
+                    "status": str, "product_type": str, "gateway": str},
+    },
+    "user_test_attempts": {
+        "collection": db.user_test_attempts,
+        "fields": ["_id", "user_id", "test_id", "attempt_number", "start_time", "end_time",
+                   "total_marks_obtained", "percentage", "result", "status", "created_at"],
+        "forbidden": [],
+        "filters": {"user_id": export_object_id, "test_id": export_object_id,
+                    "status": str, "result": str},
+    },
+}
+
+@app.get("/admin/export/{collection_name}", dependencies=[Depends(require_admin_token)])
+async def export_collection(
+    collection_name: str,
+    request: Request,
+    format: str = "ndjson",
+    fields: str = "",
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    gzip: bool = False
+):
+    """
+    Stream a whole collection as NDJSON or CSV straight from the database cursor.
+
+    `fields` is a comma separated column list (dotted paths allowed), `since` /
+    `until` bound created_at, and the collection's filter names (e.g. status,
+    user_id) can be passed as query parameters. `gzip=true` compresses on the fly.
+    """
+    spec = EXPORT_COLLECTIONS.get(collection_name)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {collection_name}")
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    
+    try:
+        columns = parse_fields(fields, spec["fields"], spec["forbidden"])
+        filter_query = {}
+        for name, convert in spec["filters"].items():
+            value = request.query_params.get(name)
+            if value is not None:
+                filter_query[name] = convert(value)
+        if since or until:
+            date_filter = {}
+            if since:
+                date_filter["$gte"] = datetime.fromisoformat(since.replace('Z', '+00:00'))
+            if until:
+                date_filter["$lt"] = datetime.fromisoformat(until.replace('Z', '+00:00'))
+            filter_query["created_at"] = date_filter
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # MongoDB rejects a path together with one of its sub-paths
+    projection = {
+        field: 1 for field in columns
+        if not any(field.startswith(other + ".") for other in columns)
+    }
+    if "_id" not in columns:
+        projection["_id"] = 0
+    cursor = spec["collection"].find(filter_query, projection).sort("_id", 1).batch_size(1000)
+    
+    chunks = ndjson_chunks(cursor, columns) if format == "ndjson" else csv_chunks(cursor, columns)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    filename = f"{collection_name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{format}"
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        media_type = "application/gzip"
+        filename += ".gz"
+    
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # =============== APP SETTINGS / FEATURE FLAGS ===============
 
 @app.get("/duallogin")
@@ -1889,7 +2752,7 @@ async def update_dual_login_state(update: DualLoginUpdate):
 # =============== SEARCH ROUTES ===============
 
 @app.get("/search/courses")
-async def search_courses(query: str = "", category: str = "", limit: int = 10):
+async def search_courses(query: str = "", category: str = "", limit: int = 10, projection: Optional[dict] = Depends(fieldset_projection("courses"))):
     filter_dict = {}
     
     if query:
@@ -1902,14 +2765,11 @@ async def search_courses(query: str = "", category: str = "", limit: int = 10):
     if category:
         filter_dict["category"] = category
     
-    courses = []
-    async for course in db.courses.find(filter_dict).limit(limit):
-        courses.append(serialize_object(course))
-    
-    return {"courses": courses}
+    courses = await db.courses.find(filter_dict, projection).limit(limit).to_list(None)
+    return FastJSONResponse({"courses": courses})
 
 @app.get("/search/materials")
-async def search_materials(query: str = "", sub_category: str = "", course: str = "", limit: int = 10):
+async def search_materials(query: str = "", sub_category: str = "", course: str = "", limit: int = 10, projection: Optional[dict] = Depends(fieldset_projection("materials"))):
     filter_dict = {}
     
     if query:
@@ -1925,14 +2785,11 @@ async def search_materials(query: str = "", sub_category: str = "", course: str
     if course:
         filter_dict["course"] = course
     
-    materials = []
-    async for material in db.materials.find(filter_dict).limit(limit):
-        materials.append(serialize_object(material))
-    
-    return {"materials": materials}
+    materials = await db.materials.find(filter_dict, projection).limit(limit).to_list(None)
+    return FastJSONResponse({"materials": materials})
 
 @app.get("/search/tests")
-async def search_tests(query: str = "", subject: str = "", difficulty: str = "", limit: int = 10):
+async def search_tests(query: str = "", subject: str = "", difficulty: str = "", limit: int = 10, projection: Optional[dict] = Depends(fieldset_projection("online_tests"))):
     filter_dict = {}
     
     if query:
@@ -1948,19 +2805,19 @@ async def search_tests(query: str = "", subject: str = "", difficulty: str = "",
     if difficulty:
         filter_dict["difficulty_level"] = difficulty
     
-    tests = []
-    async for test in db.online_tests.find(filter_dict).limit(limit):
-        tests.append(serialize_object(test))
-    
-    return {"tests": tests}
+    tests = await db.online_tests.find(filter_dict, projection).limit(limit).to_list(None)
+    return FastJSONResponse({"tests": tests})
 
 # =============== FEEDBACK ROUTES ===============
 
+async def get_user_name(user_id: str) -> Optional[str]:
+    """Display name stored with feedback entries"""
+    user = await db.users.find_one({"_id": ObjectId(user_id)}, {"name": 1})
+    return user.get("name") if user else None
+
 @app.post("/feedback/material/{material_id}")
 async def add_material_feedback(material_id: str, feedback_data: dict, user_id: str = Depends(get_current_user)):
-    # Resolve user name for display
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    user_name = user.get("name") if user else None
+    user_name = await get_user_name(user_id)
     feedback = {
         "user_id": ObjectId(user_id),
         "user_name": user_name,
@@ -1971,8 +2828,9 @@ async def add_material_feedback(material_id: str, feedback_data: dict, user_id:
     
     result = await db.materials.update_one(
         {"_id": ObjectId(material_id)},
-        {"$push": {"feedback": feedback}}
+        {"$push": {"feedback": feedback}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    await content_changed("materials")
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Material not found")
@@ -1981,8 +2839,7 @@ async def add_material_feedback(material_id: str, feedback_data: dict, user_id:
 
 @app.post("/feedback/test/{test_id}")
 async def add_test_feedback(test_id: str, feedback_data: dict, user_id: str = Depends(get_current_user)):
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    user_name = user.get("name") if user else None
+    user_name = await get_user_name(user_id)
     feedback = {
         "user_id": ObjectId(user_id),
         "user_name": user_name,
@@ -1993,8 +2850,9 @@ async def add_test_feedback(test_id: str, feedback_data: dict, user_id: str = De
     
     result = await db.online_tests.update_one(
         {"_id": ObjectId(test_id)},
-        {"$push": {"feedback": feedback}}
+        {"$push": {"feedback": feedback}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    await content_changed("online_tests")
     
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Test not found")
@@ -2007,14 +2865,7 @@ async def add_course_feedback(course_id: str, feedback_data: dict, user_id: str
     Add feedback for a course directly on the course document (no enrollment required).
     Stored structure mirrors material feedback: { user_id, rating, comment, created_at }.
     """
-    # Validate course exists
-    course = await db.courses.find_one({"_id": ObjectId(course_id)})
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    # Build feedback entry
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    user_name = user.get("name") if user else None
+    user_name = await get_user_name(user_id)
     feedback = {
         "user_id": ObjectId(user_id),
         "user_name": user_name,
@@ -2027,9 +2878,10 @@ async def add_course_feedback(course_id: str, feedback_data: dict, user_id: str
         {"_id": ObjectId(course_id)},
         {"$push": {"feedback": feedback}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    await content_changed("courses")
 
-    if result.modified_count == 0:
-        raise HTTPException(status_code=500, detail="Failed to add course feedback")
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Course not found")
 
     return {"message": "Course feedback added successfully"}
 
@@ -2157,15 +3009,15 @@ async def get_payment_history(user_id: str):
     async for link in db.payment_links.find(user_query).sort("created_at", -1):
         payment_links.append(serialize_object(link))
     
-    # Get payment status records for this user (join by payment_id in links)
-    payment_statuses = []
-    for link in payment_links:
-        pid = link.get("link_id") or link.get("payment_id")
-        if not pid:
-            continue
-        status = await db.payment_status.find_one({"payment_id": pid})
-        if status:
-            payment_statuses.append(serialize_object(status))
+    # Get payment status records for this user (join by payment_id in links, one query)
+    payment_ids = [link.get("link_id") or link.get("payment_id") for link in payment_links]
+    statuses_by_id = {}
+    if any(payment_ids):
+        async for status in db.payment_status.find({"payment_id": {"$in": [pid for pid in payment_ids if pid]}}):
+            statuses_by_id.setdefault(status["payment_id"], status)
+    payment_statuses = [
+        serialize_object(statuses_by_id[pid]) for pid in payment_ids if pid in statuses_by_id
+    ]
     
     return {
         "user_id": user_id,
@@ -2319,17 +3171,23 @@ async def create_carousel_item(image: UploadFile = File(...)):
         "updated_at": datetime.utcnow()
     }
     result = await db.carousel.insert_one(item)
+    await content_changed("carousel")
     return {"message": "Carousel item created", "id": str(result.inserted_id)}
 
-@app.get("/carousel")
-async def get_carousel_items():
+async def load_carousel_items() -> List[dict]:
     items = []
     async for it in db.carousel.find().sort("created_at", -1):
         # Normalize fields for frontend contract
         if "image_url" not in it:
             it["image_url"] = ""
         items.append(serialize_object({"_id": it.get("_id"), "image_url": it.get("image_url"), "created_at": it.get("created_at"), "updated_at": it.get("updated_at")}))
-    return {"items": items}
+    return items
+
+@app.get("/carousel")
+async def get_carousel_items():
+    async def build():
+        return dumps({"items": await load_carousel_items()})
+    return await cached_json("carousel", "list", build)
 
 @app.delete("/carousel/{item_id}")
 async def delete_carousel_item(item_id: str):
@@ -2344,6 +3202,7 @@ async def delete_carousel_item(item_id: str):
     except Exception:
         pass
     result = await db.carousel.delete_one({"_id": ObjectId(item_id)})
+    await content_changed("carousel")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Carousel item not found")
     return {"message": "Carousel item deleted"}
@@ -2361,18 +3220,19 @@ async def create_youtube_video(video: YouTubeVideoCreate):
         "updated_at": datetime.utcnow(),
     }
     result = await db.youtube_videos.insert_one(item)
+    await content_changed("youtube_videos")
     return {"message": "YouTube video saved", "id": str(result.inserted_id)}
 
 @app.get("/youtube")
-async def get_youtube_videos():
-    items = []
-    async for it in db.youtube_videos.find().sort("created_at", -1):
-        items.append(serialize_object(it))
-    return {"videos": items}
+async def get_youtube_videos(projection: Optional[dict] = Depends(fieldset_projection("youtube_videos"))):
+    async def build():
+        return dumps({"videos": await db.youtube_videos.find({}, projection).sort("created_at", -1).to_list(None)})
+    return await cached_json("youtube_videos", f"list:{projection}", build)
 
 @app.delete("/youtube/{video_id}")
 async def delete_youtube_video(video_id: str):
     result = await db.youtube_videos.delete_one({"_id": ObjectId(video_id)})
+    await content_changed("youtube_videos")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="YouTube video not found")
     return {"message": "YouTube video deleted"}
@@ -2388,19 +3248,20 @@ async def create_text_slider(item: TextSliderCreate):
         "updated_at": datetime.utcnow(),
     }
     result = await db.text_slider.insert_one(record)
+    await content_changed("text_slider")
     return {"message": "Text added", "id": str(result.inserted_id)}
 
 @app.get("/text-slider")
-async def get_text_slider():
-    items = []
-    async for it in db.text_slider.find().sort("created_at", -1):
-        items.append(serialize_object(it))
-    return {"items": items}
+async def get_text_slider(projection: Optional[dict] = Depends(fieldset_projection("text_slider"))):
+    async def build():
+        return dumps({"items": await db.text_slider.find({}, projection).sort("created_at", -1).to_list(None)})
+    return await cached_json("text_slider", f"list:{projection}", build)
 
 @app.put("/text-slider/{item_id}")
 async def update_text_slider(item_id: str, data: dict):
     data["updated_at"] = datetime.utcnow()
     result = await db.text_slider.update_one({"_id": ObjectId(item_id)}, {"$set": data})
+    await content_changed("text_slider")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Text item not found")
     return {"message": "Text updated"}
@@ -2408,10 +3269,63 @@ async def update_text_slider(item_id: str, data: dict):
 @app.delete("/text-slider/{item_id}")
 async def delete_text_slider(item_id: str):
     result = await db.text_slider.delete_one({"_id": ObjectId(item_id)})
+    await content_changed("text_slider")
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Text item not found")
     return {"message": "Text deleted"}
 
+# =============== HOME SCREEN BUNDLE ===============
+
+# Everything the app's home screen used to fetch with six requests. The encoded
+# body is rebuilt when one of these collections changes (content_changed), or
+# after HOME_CACHE_TTL_SECONDS in case an event from another worker was lost.
+HOME_COLLECTIONS = ("carousel", "youtube_videos", "text_slider", "testimonials", "contacts", "terms_conditions")
+HOME_CACHE_TTL_SECONDS = int(os.getenv("HOME_CACHE_TTL_SECONDS", "300"))
+
+home_bundle = {"versions": None, "expires_at": 0.0, "body": b""}
+home_bundle_lock = asyncio.Lock()
+
+def home_bundle_fresh(versions) -> bool:
+    return home_bundle["versions"] == versions and home_bundle["expires_at"] > time.monotonic()
+
+async def build_home_bundle() -> bytes:
+    carousel, videos, text_items, testimonials, contact, terms = await asyncio.gather(
+        load_carousel_items(),
+        db.youtube_videos.find().sort("created_at", -1).to_list(None),
+        db.text_slider.find().sort("created_at", -1).to_list(None),
+        db.testimonials.find().to_list(None),
+        db.contacts.find_one({"is_active": True}),
+        db.terms_conditions.find_one({"is_active": True})
+    )
+    return dumps({
+        "carousel": carousel,
+        "videos": videos,
+        "text_slider": text_items,
+        "testimonials": testimonials,
+        "contact": contact,
+        "terms": terms
+    })
+
+@app.get("/home")
+async def get_home_bundle():
+    """
+    Carousel, YouTube videos, text slider, testimonials, contact info and
+    terms in one response; contact and terms are null when none is active.
+    """
+    if not home_bundle_fresh(content_versions.snapshot(HOME_COLLECTIONS)):
+        # One rebuild at a time; waiters reuse its result
+        async with home_bundle_lock:
+            # Snapshot before querying, so a write during the build forces another one
+            versions = content_versions.snapshot(HOME_COLLECTIONS)
+            if not home_bundle_fresh(versions):
+                body = await build_home_bundle()
+                home_bundle.update(
+                    versions=versions,
+                    expires_at=time.monotonic() + HOME_CACHE_TTL_SECONDS,
+                    body=body
+                )
+    return Response(content=home_bundle["body"], media_type="application/json")
+
 # =============== BULK OPERATIONS ROUTES ===============
 
 @app.post("/bulk/questions")
@@ -2446,6 +3360,7 @@ async def bulk_create_materials(materials_data: List[MaterialCreate]):
         materials_list.append(material_dict)
     
     result = await db.materials.insert_many(materials_list)
+    await content_changed("materials")
     return {"message": f"{len(result.inserted_ids)} materials created successfully"}
 
 # =============== STARTUP EVENT ===============
@@ -2459,6 +3374,54 @@ async def startup_event():
     asyncio.create_task(poll_payment_status())
     print("Payment polling background task started")
 
+    # Start batched session last_activity writes
+    activity_buffer.start()
+    
+    # Indexes for every hot query (see utils/indexes.py)
+    try:
+        failures = await ensure_indexes(db, app_indexes(int(SESSION_TTL_DAYS * 24 * 3600)), RETIRED_INDEXES)
+        for failure in failures:
+            print(f"Failed to create index {failure}")
+    except Exception as e:
+        print(f"Failed to create indexes: {str(e)}")
+    
+    # Start session compaction task
+    asyncio.create_task(compact_user_sessions())
+    
+    # Keep Google's (and Firebase's) signing keys fresh
+    asyncio.create_task(google_key_set.run())
+    if FIREBASE_PROJECT_ID:
+        asyncio.create_task(firebase_key_set.run())
+    
+    # TTL cleanup of idle shared rate-limit buckets
+    if isinstance(rate_limiter, MongoRateLimiter):
+        try:
+            await rate_limiter.ensure_indexes()
+        except Exception as e:
+            print(f"Failed to create rate limit indexes: {str(e)}")
+    
+    # Shared content versions behind the catalog list ETags
+    try:
+        await content_versions.load()
+    except Exception as e:
+        print(f"[content] failed to load content versions, list ETags disabled: {str(e)}")
+    
+    # Fan out session/user cache invalidations to the other workers
+    if INVALIDATION_BUS != "none":
+        try:
+            await start_invalidation_bus()
+        except Exception as e:
+            print(f"[bus] failed to start, caches are per-worker only: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Flush buffered writes before the application exits
+    """
+    await activity_buffer.stop()
+    await invalidation_bus.stop()
+    password_hasher.shutdown()
+
 # =============== RUN SERVER ===============
 
 if __name__ == "__main__":
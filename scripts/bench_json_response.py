@@ -0,0 +1,146 @@
+"""
+Benchmark the JSON path of a large list endpoint (GET /materials).
+
+Compares the original path, serialize_object over every document, then
+FastAPI's jsonable_encoder, then JSONResponse.render, with FastJSONResponse
+rendering the decoded documents in one orjson pass, and (when python-bsonjs is
+installed) with the RawBSONDocument path converting BSON straight to JSON.
+Every path starts from the BSON the driver receives and all outputs are
+checked to decode to the same JSON. No database needed; documents are generated.
+
+Usage: python scripts/bench_json_response.py [--documents 10000] [--rounds 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.json_response import FastJSONResponse
+from utils.raw_json import BSONJS_AVAILABLE, raw_to_json
+
+
+def serialize_object(obj):
+    """The per-document conversion every list handler ran before (from main.py)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, dict):
+        return {key: serialize_object(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [serialize_object(item) for item in obj]
+    return obj
+
+
+def make_materials(count: int):
+    """Documents shaped like create_material's, with a few feedback entries each"""
+    now = datetime.utcnow()
+    materials = []
+    for i in range(count):
+        created = now - timedelta(minutes=i)
+        materials.append({
+            "_id": ObjectId(),
+            "class_name": f"Class {i % 12 + 1}",
+            "course": f"Course {i % 40}",
+            "sub_category": ["Notes", "Question Bank", "Solutions"][i % 3],
+            "module": f"Module {i % 8}",
+            "title": f"Material {i}: revision notes and solved examples",
+            "description": "Chapter-wise notes with worked examples and practice questions. " * 3,
+            "academic_year": "2025-2026",
+            "time_period": 12,
+            "price": float(i % 5 * 49),
+            "file_url": f"/uploads/materials/{ObjectId()}.pdf",
+            "file_size": 1024 * (100 + i % 900),
+            "sample_images": [f"/uploads/materials/samples/{ObjectId()}.jpg" for _ in range(i % 3)],
+            "download_count": i * 7 % 1000,
+            "tags": ["exam", "notes"],
+            "feedback": [
+                {
+                    "user_id": ObjectId(),
+                    "user_name": f"Student {j}",
+                    "rating": j % 5 + 1,
+                    "comment": "Very helpful",
+                    "created_at": created + timedelta(seconds=j),
+                }
+                for j in range(i % 4)
+            ],
+            "is_active": True,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return materials
+
+
+def old_path(payloads) -> bytes:
+    materials = [bson.decode(payload) for payload in payloads]
+    content = {"materials": [serialize_object(material) for material in materials]}
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def new_path(payloads) -> bytes:
+    materials = [bson.decode(payload) for payload in payloads]
+    return FastJSONResponse(content={"materials": materials}).body
+
+
+def raw_path(payloads) -> bytes:
+    parts = [raw_to_json(RawBSONDocument(payload)) for payload in payloads]
+    return b'{"materials":[' + b",".join(parts) + b"]}"
+
+
+def measure(fn, materials, rounds: int):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        body = fn(materials)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn(materials)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return body, timings, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = [bson.encode(material) for material in make_materials(args.documents)]
+    paths = [("serialize_object + jsonable_encoder", old_path), ("FastJSONResponse", new_path)]
+    if BSONJS_AVAILABLE:
+        paths.append(("RawBSONDocument + bsonjs", raw_path))
+    else:
+        print("python-bsonjs not installed, skipping the RawBSONDocument path")
+
+    results = [(name, *measure(fn, payloads, args.rounds)) for name, fn in paths]
+    expected = json.loads(results[0][1])
+    for name, body, _, _ in results[1:]:
+        if json.loads(body) != expected:
+            print(f"{name}: output differs!")
+            sys.exit(1)
+
+    print(f"{args.documents} materials, {len(results[0][1]) / 1e6:.1f} MB body, {args.rounds} rounds")
+    baseline = statistics.median(results[0][2])
+    for name, _, timings, peak in results:
+        median = statistics.median(timings)
+        print(
+            f"{name:<38} median {median * 1000:8.1f} ms   best {min(timings) * 1000:8.1f} ms"
+            f"   {baseline / median:5.1f}x   peak {peak / 1e6:6.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark the database side of /auth/login against a real MongoDB.
+
+Compares the original login sequence (find_one, last_login update_one,
+count_documents, update_many over all sessions, insert_one) with
+SessionStore.login (find_one, then one concurrent compare-and-set +
+bulk_write). Password hashing is left out; it is identical in both paths.
+
+Reports round trips per login (via a pymongo CommandListener), latency
+percentiles and throughput for a "login storm" of concurrent users.
+
+Usage: python scripts/bench_login_path.py [--mongo-url mongodb://localhost:27017]
+           [--users 200] [--logins-per-user 5] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from utils.indexes import app_indexes, ensure_indexes
+from utils.session_store import SessionStore
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def legacy_login(db, email: str):
+    user = await db.users.find_one({"email": email})
+    await db.users.update_one({"_id": user["_id"]}, {"$set": {"last_login": datetime.utcnow()}})
+    await db.user_sessions.count_documents({"user_id": user["_id"], "is_active": True})
+    await db.user_sessions.update_many(
+        {"user_id": user["_id"]},
+        {"$set": {"is_active": False, "ended_at": datetime.utcnow()}}
+    )
+    await db.user_sessions.insert_one({
+        "user_id": user["_id"],
+        "session_id": str(uuid.uuid4()),
+        "is_active": True,
+        "device_info": {},
+        "created_at": datetime.utcnow(),
+        "last_activity": datetime.utcnow(),
+        "ended_at": None
+    })
+
+
+async def store_login(db, store: SessionStore, email: str):
+    user = await db.users.find_one({"email": email})
+    await store.login(user, user_updates={"last_login": datetime.utcnow()})
+
+
+async def run(label: str, login, emails, concurrency: int, counter: CommandCounter):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(email):
+        async with semaphore:
+            started = time.perf_counter()
+            await login(email)
+            latencies.append(time.perf_counter() - started)
+
+    commands_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(one(email) for email in emails))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p99 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.99))]
+    print(
+        f"{label:<14} logins={len(emails):<6} round_trips/login={(counter.count - commands_before) / len(emails):4.1f} "
+        f"p50={statistics.median(latencies_ms):7.2f}ms p99={p99:7.2f}ms throughput={len(emails) / elapsed:8.1f}/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="vidyarthi_mitraa_login_bench")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--logins-per-user", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(args.mongo_url, event_listeners=[counter])
+    await client.drop_database(args.database)
+    db = client[args.database]
+    store = SessionStore(db.users, db.user_sessions)
+    await ensure_indexes(db, app_indexes())
+
+    emails = [f"bench{i}@example.com" for i in range(args.users)]
+    await db.users.insert_many([{"email": email, "name": email, "session_generation": 0} for email in emails])
+    storm = emails * args.logins_per_user
+
+    try:
+        await run("before", lambda email: legacy_login(db, email), storm, args.concurrency, counter)
+        await db.user_sessions.delete_many({})
+        await run("session store", lambda email: store_login(db, store, email), storm, args.concurrency, counter)
+        active = await db.user_sessions.count_documents({"is_active": True})
+        print(f"active sessions after store logins: {active} (expected {args.users})")
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
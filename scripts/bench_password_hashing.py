@@ -0,0 +1,77 @@
+"""
+Benchmark login password checks: inline bcrypt vs the pooled PasswordHasher.
+
+Simulates N concurrent logins and reports login throughput together with
+event-loop latency (how late a 10ms ticker wakes up while logins run).
+
+Usage: python scripts/bench_password_hashing.py [--logins 64] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import pwd_context
+from utils.password_hasher import PasswordHasher
+
+TICK_SECONDS = 0.01
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append(time.perf_counter() - started - TICK_SECONDS)
+
+
+async def run(label: str, login, logins: int):
+    stop = asyncio.Event()
+    lag_samples = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    assert all(results), "password check failed"
+
+    lag_ms = sorted(sample * 1000 for sample in lag_samples) or [0.0]
+    p99 = lag_ms[min(len(lag_ms) - 1, int(len(lag_ms) * 0.99))]
+    print(
+        f"{label:<18} logins={logins:<5} time={elapsed:7.2f}s "
+        f"throughput={logins / elapsed:8.1f}/s "
+        f"loop_lag_median={statistics.median(lag_ms):7.1f}ms p99={p99:7.1f}ms max={lag_ms[-1]:7.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    stored_hash = pwd_context.hash(password)
+    hasher = PasswordHasher(pwd_context, max_workers=args.workers)
+
+    async def inline_login():
+        return pwd_context.verify(password, stored_hash)
+
+    async def pooled_login():
+        valid, _ = await hasher.verify(password, stored_hash)
+        return valid
+
+    await run("inline bcrypt", inline_login, args.logins)
+    await run(f"pool ({args.workers} workers)", pooled_login, args.logins)
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+Create the application's MongoDB indexes (utils/indexes.py), or verify them.
+
+    python scripts/init_db.py            create/refresh every registered index
+    python scripts/init_db.py --check    explain every registered query shape and
+                                         exit 1 if any is answered by a COLLSCAN
+
+Connection settings come from MONGODB_URL / DATABASE_NAME (defaults match main.py).
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from utils.indexes import RETIRED_INDEXES, app_indexes, app_query_shapes, check_query_shapes, ensure_indexes
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default=os.getenv("DATABASE_NAME", "vidyarthi_mitraa"))
+    parser.add_argument("--check", action="store_true", help="only explain the registered query shapes")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.database]
+    try:
+        if args.check:
+            results = await check_query_shapes(db, app_query_shapes())
+            for shape, problem in results:
+                print(f"{'FAIL' if problem else 'ok  '} {shape.collection:<22} {shape.name}{f' ({problem})' if problem else ''}")
+            failed = sum(1 for _, problem in results if problem)
+            print(f"{len(results) - failed}/{len(results)} query shapes use an index")
+            return 1 if failed else 0
+
+        ttl_seconds = int(float(os.getenv("SESSION_TTL_DAYS", "30")) * 24 * 3600)
+        specs = app_indexes(ttl_seconds)
+        failures = await ensure_indexes(db, specs, RETIRED_INDEXES)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"{len(specs) - len(failures)}/{len(specs)} indexes in place")
+        return 1 if failures else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    """main, running against an in-memory MongoDB (mongomock-motor)"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import motor.motor_asyncio
+
+    os.environ.setdefault("INVALIDATION_BUS", "none")
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    import main
+    return main
+
+
+@pytest.fixture
+def client(app_module):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_module.app) as test_client:
+        yield test_client
+        # Process-wide caches would otherwise serve one test's data to the next
+        app_module.compressed_catalog_cache.clear()
+        app_module.content_cache.clear()
+        app_module.content_versions.clear()
+        app_module.catalog_detail_etags.clear()
+        db = app_module.db
+        for name in test_client.portal.call(db.list_collection_names):
+            test_client.portal.call(db.drop_collection, name)
@@ -0,0 +1,45 @@
+import pytest
+
+TOKEN = "admin-secret"
+
+
+@pytest.fixture
+def admin_token(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_EXPORT_TOKEN", TOKEN)
+    return {"X-Admin-Token": TOKEN}
+
+
+def test_admin_routes_disabled_without_configured_token(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ADMIN_EXPORT_TOKEN", "")
+    assert client.get("/debug/queries").status_code == 403
+    assert client.get("/debug/queries", headers={"X-Admin-Token": ""}).status_code == 403
+    assert client.get("/admin/export/users").status_code == 403
+
+
+def test_query_stats_need_admin_token(client, admin_token):
+    assert client.get("/debug/queries").status_code == 403
+    assert client.get("/debug/queries", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/debug/queries", headers=admin_token).status_code == 200
+
+
+def test_query_stats_reset_is_a_post(client, admin_token):
+    assert client.get("/debug/queries/reset", headers=admin_token).status_code == 405
+    assert client.post("/debug/queries/reset").status_code == 403
+    assert client.post("/debug/queries/reset", headers=admin_token).status_code == 200
+
+
+def test_token_cache_stats_need_admin_token(client, admin_token):
+    assert client.get("/debug/token-cache").status_code == 403
+    assert client.get("/debug/token-cache", headers=admin_token).status_code == 200
+
+
+def test_compression_stats_need_admin_token(client, admin_token):
+    assert client.get("/debug/compression").status_code == 403
+    assert client.get("/debug/compression", headers=admin_token).status_code == 200
+
+
+def test_content_cache_stats_need_admin_token(client, admin_token):
+    assert client.get("/debug/content-cache").status_code == 403
+    assert client.get("/debug/content-cache", headers=admin_token).status_code == 200
+    assert client.post("/debug/content-cache/reset").status_code == 403
+    assert client.post("/debug/content-cache/reset", headers=admin_token).status_code == 200
@@ -0,0 +1,64 @@
+import pytest
+
+from tests.test_google_auth import CLIENT_ID, FIREBASE_PROJECT, make_key, make_token, write_jwks
+from utils.google_auth import GoogleKeySet, GoogleTokenVerifier
+
+SIGN_IN = {"firebase_uid": "fb-posted", "name": "Asha", "email": "student@example.com"}
+
+
+@pytest.fixture
+def private_key(tmp_path, monkeypatch, app_module):
+    private_key, jwk = make_key("key-1")
+    jwks_file = tmp_path / "jwks.json"
+    write_jwks(jwks_file, jwk)
+    key_set = GoogleKeySet(local_file=str(jwks_file))
+    verifier = GoogleTokenVerifier(
+        key_set, audiences=[CLIENT_ID], firebase_project_id=FIREBASE_PROJECT, firebase_key_set=key_set
+    )
+    monkeypatch.setattr(app_module, "google_token_verifier", verifier)
+    return private_key
+
+
+def find_user(client, app_module, email):
+    return client.portal.call(app_module.db.users.find_one, {"email": email})
+
+
+def test_token_rejected_when_verification_is_not_configured(client, app_module, monkeypatch):
+    private_key, _ = make_key("key-1")
+    monkeypatch.setattr(app_module, "google_token_verifier", GoogleTokenVerifier(GoogleKeySet(local_file="missing.json")))
+    response = client.post("/auth/google", json={**SIGN_IN, "id_token": make_token(private_key, "key-1")})
+    assert response.status_code == 401
+    assert find_user(client, app_module, SIGN_IN["email"]) is None
+
+
+def test_google_token_sets_google_sub_not_firebase_uid(client, app_module, private_key):
+    client.portal.call(app_module.db.users.insert_one, {"email": SIGN_IN["email"], "firebase_uid": "fb-original"})
+    response = client.post("/auth/google", json={**SIGN_IN, "id_token": make_token(private_key, "key-1", sub="google-123")})
+    assert response.status_code == 200, response.text
+    user = find_user(client, app_module, SIGN_IN["email"])
+    assert user["google_sub"] == "google-123"
+    assert user["firebase_uid"] == "fb-posted"
+
+
+def test_google_sub_finds_the_account(client, app_module, private_key):
+    client.portal.call(app_module.db.users.insert_one, {"email": "old@example.com", "google_sub": "google-123"})
+    token = make_token(private_key, "key-1", sub="google-123")
+    response = client.post("/auth/google", json={**SIGN_IN, "id_token": token})
+    assert response.status_code == 200, response.text
+    assert response.json()["user"]["email"] == "old@example.com"
+
+
+def test_firebase_token_sets_firebase_uid(client, app_module, private_key):
+    token = make_token(
+        private_key, "key-1", iss=f"https://securetoken.google.com/{FIREBASE_PROJECT}", aud=FIREBASE_PROJECT, sub="fb-verified"
+    )
+    response = client.post("/auth/google", json={**SIGN_IN, "id_token": token})
+    assert response.status_code == 200, response.text
+    user = find_user(client, app_module, SIGN_IN["email"])
+    assert user["firebase_uid"] == "fb-verified"
+    assert "google_sub" not in user
+
+
+def test_token_email_must_match(client, app_module, private_key):
+    token = make_token(private_key, "key-1", email="someone-else@example.com")
+    assert client.post("/auth/google", json={**SIGN_IN, "id_token": token}).status_code == 401
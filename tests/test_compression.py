@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+from utils.compression import choose_encoding
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest.fixture
+def course_ids(client, app_module):
+    courses = [
+        {"title": f"Course {n}", "description": "x" * 200, "is_active": True, "updated_at": datetime.utcnow()}
+        for n in range(20)
+    ]
+    result = client.portal.call(app_module.db.courses.insert_many, courses)
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+
+@pytest.fixture
+def list_calls(app_module, monkeypatch):
+    calls = []
+    original = app_module.catalog_list_response
+
+    async def counting(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "catalog_list_response", counting)
+    return calls
+
+
+def test_repeat_requests_skip_the_route(client, course_ids, list_calls):
+    first = client.get("/courses", headers=GZIP)
+    second = client.get("/courses", headers=GZIP)
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert first.content == second.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert len(second.json()["courses"]) == 20
+    assert len(list_calls) == 1
+
+
+def test_query_and_encoding_are_part_of_the_key(client, course_ids, list_calls):
+    client.get("/courses", headers=GZIP)
+    assert len(client.get("/courses?limit=5", headers=GZIP).json()["courses"]) == 5
+    client.get("/courses", headers={"Accept-Encoding": "identity"})
+    assert len(list_calls) == 3
+
+
+def test_content_change_invalidates(client, course_ids, list_calls):
+    client.get("/courses", headers=GZIP)
+    client.put(f"/courses/{course_ids[-1]}", json={"title": "Renamed"})
+    titles = [course["title"] for course in client.get("/courses", headers=GZIP).json()["courses"]]
+    assert "Renamed" in titles
+    assert len(list_calls) == 2
+
+
+def test_conditional_requests_reach_the_route(client, course_ids, list_calls):
+    etag = client.get("/courses", headers=GZIP).headers["etag"]
+    response = client.get("/courses", headers={**GZIP, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*;q=0.5", brotli_enabled=False) == "gzip"
+    assert choose_encoding("identity") is None
@@ -0,0 +1,92 @@
+import asyncio
+
+from utils.content_cache import ContentCache
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_hit_after_load():
+    cache = ContentCache({"carousel": 60})
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return b"[1]"
+
+    async def scenario():
+        assert await cache.get_or_load("carousel", "all", load) == b"[1]"
+        assert await cache.get_or_load("carousel", "all", load) == b"[1]"
+
+    run(scenario())
+    assert len(loads) == 1
+
+
+def test_invalidation_during_load_is_not_stored():
+    cache = ContentCache({"carousel": 60})
+
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def stale_load():
+            started.set()
+            await release.wait()
+            return b"stale"
+
+        task = asyncio.create_task(cache.get_or_load("carousel", "all", stale_load))
+        await started.wait()
+        # A write lands while the old body is still being read
+        cache.invalidate("carousel")
+        release.set()
+        assert await task == b"stale"
+
+        async def fresh_load():
+            return b"fresh"
+
+        return await cache.get_or_load("carousel", "all", fresh_load)
+
+    assert run(scenario()) == b"fresh"
+    assert cache.stats()["entries"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ContentCache({"carousel": 60})
+    loads = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def load():
+            loads.append(1)
+            await release.wait()
+            return b"[1]"
+
+        tasks = [asyncio.create_task(cache.get_or_load("carousel", "all", load)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert run(scenario()) == [b"[1]"] * 3
+    assert len(loads) == 1
+
+
+def test_not_found_is_not_cached():
+    cache = ContentCache({"carousel": 60})
+
+    async def missing():
+        return None
+
+    run(cache.get_or_load("carousel", "gone", missing))
+    assert cache.stats()["entries"] == 0
+
+
+def test_testimonials_cache_only_clamped_first_pages(client, app_module):
+    testimonials = [{"name": f"Student {n}", "is_active": True} for n in range(3)]
+    client.portal.call(app_module.db.testimonials.insert_many, testimonials)
+    first = client.get("/testimonials", params={"limit": 2}).json()
+    client.get("/testimonials", params={"limit": 2, "cursor": first["next_cursor"]})
+    for limit in (100000, 100001, app_module.CATALOG_LIST_MAX_LIMIT):
+        client.get("/testimonials", params={"limit": limit})
+    # limit=2, and one entry for every limit clamped to the maximum; none for the cursor page
+    assert app_module.content_cache.stats()["collections"]["testimonials"]["entries"] == 2
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def course_id(client, app_module):
+    course = {"title": "Algebra", "description": "Basics", "is_active": True, "updated_at": datetime.utcnow()}
+    result = client.portal.call(app_module.db.courses.insert_one, course)
+    return str(result.inserted_id)
+
+
+def etags(client, course_id):
+    return client.get("/courses").headers["etag"], client.get(f"/courses/{course_id}").headers["etag"]
+
+
+def test_unchanged_course_revalidates(client, course_id):
+    list_etag, detail_etag = etags(client, course_id)
+    assert client.get("/courses", headers={"If-None-Match": list_etag}).status_code == 304
+    assert client.get(f"/courses/{course_id}", headers={"If-None-Match": detail_etag}).status_code == 304
+
+
+def test_edit_changes_list_and_detail_etags(client, course_id):
+    before = etags(client, course_id)
+    client.put(f"/courses/{course_id}", json={"title": "Algebra I"})
+    after = etags(client, course_id)
+    assert after[0] != before[0]
+    assert after[1] != before[1]
+    assert client.get(f"/courses/{course_id}", headers={"If-None-Match": before[1]}).json()["course"]["title"] == "Algebra I"
+
+
+def test_enrollment_changes_etags(client, app_module, course_id, monkeypatch):
+    monkeypatch.setattr(app_module, "COUNTER_VERSION_INTERVAL_SECONDS", 0)
+    user = client.portal.call(app_module.db.users.insert_one, {"email": "student@example.com"})
+    app_module.app.dependency_overrides[app_module.get_current_user] = lambda: str(user.inserted_id)
+    try:
+        before = etags(client, course_id)
+        assert client.post("/enrollments", json={"course_id": course_id}).status_code == 200
+    finally:
+        app_module.app.dependency_overrides.clear()
+    after = etags(client, course_id)
+    assert after[0] != before[0]
+    assert after[1] != before[1]
+    response = client.get(f"/courses/{course_id}", headers={"If-None-Match": before[1]})
+    assert response.json()["course"]["enrolled_students"] == 1
+
+
+def test_counter_bumps_are_debounced(client, app_module, course_id, monkeypatch):
+    monkeypatch.setattr(app_module, "COUNTER_VERSION_INTERVAL_SECONDS", 3600)
+    before = etags(client, course_id)
+    client.portal.call(app_module.counter_changed, "courses")
+    client.portal.call(app_module.counter_changed, "courses")
+    assert list(app_module.pending_counter_bumps) == ["courses"]
+    assert etags(client, course_id) == before
+    client.portal.call(lambda: _cancel(app_module.pending_counter_bumps["courses"]))
+    assert not app_module.pending_counter_bumps
+
+
+async def _cancel(task):
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+
+
+def test_fieldset_has_its_own_detail_etag(client, course_id):
+    full = client.get(f"/courses/{course_id}")
+    slim = client.get(f"/courses/{course_id}?fields=title")
+    assert slim.headers["etag"] != full.headers["etag"]
+    response = client.get(f"/courses/{course_id}?fields=title", headers={"If-None-Match": full.headers["etag"]})
+    assert response.status_code == 200
+    assert "description" not in response.json()["course"]
@@ -0,0 +1,57 @@
+import pytest
+
+from utils.fieldsets import Fieldset, InvalidFieldset, is_valid_field, narrow_projection
+
+USERS = Fieldset(["name", "email", "profile"], forbidden=("password", "firebase_uid"))
+
+
+def test_default_projection_drops_forbidden_fields():
+    assert USERS.projection() == {"firebase_uid": 0, "password": 0}
+    assert Fieldset(["name"]).projection() is None
+
+
+def test_fields_selects_allowed_fields_only():
+    assert USERS.projection(fields="name, email,name") == {"name": 1, "email": 1}
+    assert USERS.projection(fields="profile.city,_id") == {"profile.city": 1, "_id": 1}
+    for fields in ("password", "name,password.salt", "unknown", "$where", "name.", "a..b"):
+        with pytest.raises(InvalidFieldset):
+            USERS.projection(fields=fields)
+
+
+def test_exclude_always_includes_forbidden_fields():
+    assert USERS.projection(exclude="email") == {"email": 0, "firebase_uid": 0, "password": 0}
+    assert USERS.projection(exclude="password") == {"password": 0, "firebase_uid": 0}
+    # A sub-path of an excluded field is dropped rather than colliding with it
+    assert USERS.projection(exclude="password.hash") == {"firebase_uid": 0, "password": 0}
+    with pytest.raises(InvalidFieldset):
+        USERS.projection(exclude="unknown")
+
+
+def test_fields_and_exclude_are_exclusive():
+    with pytest.raises(InvalidFieldset):
+        USERS.projection(fields="name", exclude="email")
+
+
+def test_sub_paths_collapse_into_their_parent():
+    assert USERS.projection(fields="profile,profile.city") == {"profile": 1}
+
+
+def test_free_form_collections_accept_any_plain_field():
+    fieldset = Fieldset()
+    assert fieldset.projection(fields="anything,nested.value") == {"anything": 1, "nested.value": 1}
+    with pytest.raises(InvalidFieldset):
+        fieldset.projection(fields="$gt")
+
+
+def test_narrow_projection():
+    base = {"name": 1, "email": 1}
+    assert narrow_projection(base, None) == base
+    assert narrow_projection(base, {"name": 1}) == {"name": 1}
+    assert narrow_projection(base, {"email": 0, "password": 0}) == {"name": 1}
+
+
+def test_is_valid_field():
+    for name in ("title", "_id", "address.city", "a1.b_2"):
+        assert is_valid_field(name)
+    for name in ("", "$where", "a..b", ".a", "a.", "1abc", "a.$gt", "a b"):
+        assert not is_valid_field(name)
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from utils.google_auth import GoogleKeySet, GoogleTokenError, GoogleTokenVerifier
+
+CLIENT_ID = "edutech-app.apps.googleusercontent.com"
+
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+def write_jwks(path, *jwks):
+    path.write_text(json.dumps({"keys": list(jwks)}), encoding="utf-8")
+
+
+def make_token(private_key, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "google-user-1",
+        "email": "student@example.com",
+        "email_verified": True,
+        "iat": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def signing_key(tmp_path):
+    private_key, jwk = make_key("key-1")
+    jwks_file = tmp_path / "jwks.json"
+    write_jwks(jwks_file, jwk)
+    return private_key, jwks_file
+
+
+def make_verifier(jwks_file, audiences=(CLIENT_ID,)):
+    key_set = GoogleKeySet(local_file=str(jwks_file), min_refresh_seconds=0)
+    return GoogleTokenVerifier(key_set, audiences=audiences)
+
+
+def verify(verifier, token):
+    return asyncio.run(verifier.verify(token))
+
+
+def test_valid_token(signing_key):
+    private_key, jwks_file = signing_key
+    claims = verify(make_verifier(jwks_file), make_token(private_key, "key-1"))
+    assert claims["sub"] == "google-user-1"
+    assert claims["email"] == "student@example.com"
+
+
+def test_wrong_audience(signing_key):
+    private_key, jwks_file = signing_key
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file), make_token(private_key, "key-1", aud="some-other-app"))
+
+
+def test_no_audience_configured(signing_key):
+    private_key, jwks_file = signing_key
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file, audiences=()), make_token(private_key, "key-1"))
+
+
+def test_missing_email(signing_key):
+    private_key, jwks_file = signing_key
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file), make_token(private_key, "key-1", email=None))
+
+
+def test_unverified_email(signing_key):
+    private_key, jwks_file = signing_key
+    for email_verified in (False, None, "true"):
+        with pytest.raises(GoogleTokenError):
+            verify(make_verifier(jwks_file), make_token(private_key, "key-1", email_verified=email_verified))
+
+
+def test_expired_token(signing_key):
+    private_key, jwks_file = signing_key
+    now = int(time.time())
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file), make_token(private_key, "key-1", iat=now - 7200, exp=now - 3600))
+
+
+def test_wrong_issuer(signing_key):
+    private_key, jwks_file = signing_key
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file), make_token(private_key, "key-1", iss="https://evil.example.com"))
+
+
+def test_unknown_kid_refreshes_keys(signing_key):
+    private_key, jwks_file = signing_key
+    verifier = make_verifier(jwks_file)
+    rotated_key, rotated_jwk = make_key("key-2")
+    # Google rotated its keys after the key set was loaded
+    write_jwks(jwks_file, rotated_jwk)
+    claims = verify(verifier, make_token(rotated_key, "key-2"))
+    assert claims["sub"] == "google-user-1"
+
+
+def test_unknown_kid_after_refresh(signing_key):
+    _, jwks_file = signing_key
+    other_key, _ = make_key("key-3")
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file), make_token(other_key, "key-3"))
+
+
+def test_wrong_signature(signing_key):
+    _, jwks_file = signing_key
+    other_key, _ = make_key("key-1")
+    with pytest.raises(GoogleTokenError):
+        verify(make_verifier(jwks_file), make_token(other_key, "key-1"))
+
+
+FIREBASE_PROJECT = "edutech-firebase"
+
+
+def make_firebase_verifier(jwks_file):
+    key_set = GoogleKeySet(local_file=str(jwks_file), min_refresh_seconds=0)
+    return GoogleTokenVerifier(
+        GoogleKeySet(local_file=str(jwks_file)),
+        firebase_project_id=FIREBASE_PROJECT,
+        firebase_key_set=key_set,
+    )
+
+
+def test_firebase_token(signing_key):
+    private_key, jwks_file = signing_key
+    verifier = make_firebase_verifier(jwks_file)
+    token = make_token(
+        private_key, "key-1", iss=f"https://securetoken.google.com/{FIREBASE_PROJECT}", aud=FIREBASE_PROJECT, sub="fb-uid"
+    )
+    claims = verify(verifier, token)
+    assert claims["sub"] == "fb-uid"
+    assert verifier.is_firebase(claims)
+
+
+def test_firebase_token_of_another_project(signing_key):
+    private_key, jwks_file = signing_key
+    verifier = make_firebase_verifier(jwks_file)
+    for iss, aud in (
+        ("https://securetoken.google.com/other-project", "other-project"),
+        (f"https://securetoken.google.com/{FIREBASE_PROJECT}", "other-project"),
+    ):
+        with pytest.raises(GoogleTokenError):
+            verify(verifier, make_token(private_key, "key-1", iss=iss, aud=aud))
+
+
+def test_google_token_needs_client_ids_even_with_firebase(signing_key):
+    private_key, jwks_file = signing_key
+    with pytest.raises(GoogleTokenError):
+        verify(make_firebase_verifier(jwks_file), make_token(private_key, "key-1", aud=FIREBASE_PROJECT))
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from utils.json_response import FastJSONResponse
+from utils.json_stream import json_array_chunks, json_array_response
+
+
+def test_streamed_bytes_match_fast_json_response(client, app_module):
+    material_id = ObjectId()
+    downloads = [
+        {"material_id": material_id, "user_id": ObjectId(), "download_count": n, "last_download_at": datetime.utcnow()}
+        for n in range(1203)
+    ]
+    client.portal.call(app_module.db.user_downloads.insert_many, downloads)
+
+    response = client.get(f"/downloads/material/{material_id}")
+    assert "content-length" not in response.headers  # streamed, not buffered
+    expected = client.portal.call(app_module.db.user_downloads.find({"material_id": material_id}).to_list, None)
+    assert response.content == FastJSONResponse({"downloads": expected}).body
+    assert len(response.json()["downloads"]) == 1203
+
+
+class FailingCursor:
+    def __init__(self):
+        self.closed = False
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length):
+        raise RuntimeError("connection reset")
+
+    async def close(self):
+        self.closed = True
+
+
+def test_failure_mid_stream_closes_the_cursor():
+    cursor = FailingCursor()
+
+    async def consume():
+        chunks = []
+        with pytest.raises(RuntimeError):
+            async for chunk in json_array_chunks("items", cursor, [{"n": 1}], batch_size=1):
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    assert asyncio.run(consume()) == b'{"items":[{"n":1}'
+    assert cursor.closed
+
+
+def test_small_results_are_not_streamed(client, app_module):
+    cursor = app_module.db.user_downloads.find({})
+    response = client.portal.call(json_array_response, "downloads", cursor)
+    assert response.body == b'{"downloads":[]}'
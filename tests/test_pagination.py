@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, page_filter
+
+USER_LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    values = {"created_at": datetime(2024, 5, 1, 12, 30), "_id": ObjectId()}
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", raw_cursor([1, 2]), raw_cursor("text")])
+def test_malformed_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("values", [
+    {"created_at": {"$ne": None}, "_id": {"$oid": "65f000000000000000000000"}},
+    {"created_at": {"$date": 0}, "_id": {"$gt": ""}},
+    {"created_at": [{"$exists": True}], "_id": 1},
+    {"created_at": {"nested": {"$regex": ".*"}}, "_id": 1},
+    {"created_at": {"$regex": ".*", "$options": ""}, "_id": 1},
+])
+def test_operator_values_are_rejected(values):
+    with pytest.raises(InvalidCursor):
+        page_filter({}, USER_LIST_SORT, raw_cursor(values))
+
+
+def test_missing_sort_key_is_rejected():
+    with pytest.raises(InvalidCursor):
+        page_filter({}, USER_LIST_SORT, encode_cursor({"_id": ObjectId()}))
+
+
+@pytest.fixture
+def users(client, app_module):
+    start = datetime(2024, 1, 1)
+    # Pairs share created_at, so the _id tie-breaker decides their order
+    documents = [
+        {"name": f"User {n}", "email": f"user{n}@example.com", "created_at": start + timedelta(days=n // 2)}
+        for n in range(7)
+    ]
+    client.portal.call(app_module.db.users.insert_many, documents)
+    return documents
+
+
+def test_users_pages_cover_everyone_once(client, users):
+    seen, cursor = [], None
+    while True:
+        response = client.get("/users", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        seen.extend(user["email"] for user in body["users"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    expected = sorted(users, key=lambda user: (user["created_at"], user["_id"]), reverse=True)
+    assert seen == [user["email"] for user in expected]
+
+
+def test_injected_cursor_is_a_bad_request(client, users):
+    cursor = raw_cursor({"created_at": {"$ne": None}, "_id": {"$ne": None}})
+    assert client.get("/users", params={"cursor": cursor}).status_code == 400
+    assert client.get("/courses", params={"cursor": raw_cursor({"_id": {"$ne": None}})}).status_code == 400
+
+
+def test_catalog_pages(client, app_module):
+    courses = [{"title": f"Course {n}", "is_active": True} for n in range(5)]
+    client.portal.call(app_module.db.courses.insert_many, courses)
+    first = client.get("/courses", params={"limit": 2, "fields": "title"}).json()
+    second = client.get("/courses", params={"limit": 2, "fields": "title", "cursor": first["next_cursor"]}).json()
+    third = client.get("/courses", params={"limit": 2, "fields": "title", "cursor": second["next_cursor"]}).json()
+    titles = [course["title"] for page in (first, second, third) for course in page["courses"]]
+    assert titles == [f"Course {n}" for n in reversed(range(5))]
+    assert third["next_cursor"] is None
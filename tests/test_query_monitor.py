@@ -0,0 +1,85 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.query_monitor import NPlusOneMiddleware, NPlusOneQueryError, QueryMonitor, QueryMonitorMiddleware
+
+THRESHOLD = 3
+request_ids = itertools.count(1)
+
+
+def issue(monitor, command_name, command, reply):
+    """Report one command the way the driver's listener callbacks would"""
+    request_id = next(request_ids)
+    monitor.started(SimpleNamespace(command_name=command_name, command=command, request_id=request_id))
+    monitor.succeeded(SimpleNamespace(command_name=command_name, request_id=request_id, duration_micros=500, reply=reply))
+
+
+def find(monitor, collection, query, cursor_id=0):
+    issue(monitor, "find", {"find": collection, "filter": query}, {"cursor": {"id": cursor_id, "firstBatch": [{}]}})
+
+
+@pytest.fixture
+def monitor():
+    return QueryMonitor(slow_ms=10000)
+
+
+@pytest.fixture
+def client(monitor):
+    app = FastAPI()
+
+    @app.get("/feedback")
+    def feedback(n: int):
+        # One user lookup per feedback entry: the N+1 pattern
+        for user_number in range(n):
+            find(monitor, "users", {"_id": user_number})
+        return {"count": n}
+
+    @app.get("/downloads")
+    def downloads(batches: int):
+        find(monitor, "user_downloads", {"material_id": 1}, cursor_id=42)
+        for batch in range(batches):
+            cursor_id = 0 if batch == batches - 1 else 42
+            issue(monitor, "getMore", {"getMore": 42, "collection": "user_downloads"}, {"cursor": {"id": cursor_id, "nextBatch": [{}]}})
+        return {"batches": batches}
+
+    app.add_middleware(NPlusOneMiddleware, threshold=THRESHOLD, raise_errors=True)
+    app.add_middleware(QueryMonitorMiddleware, monitor=monitor)
+    return TestClient(app)
+
+
+def test_repeated_query_shape_raises(client):
+    with pytest.raises(NPlusOneQueryError) as error:
+        client.get("/feedback", params={"n": THRESHOLD + 1})
+    assert "GET /feedback" in str(error.value)
+    assert f"{THRESHOLD + 1}x find users" in str(error.value)
+
+
+def test_threshold_is_allowed(client):
+    assert client.get("/feedback", params={"n": THRESHOLD}).json() == {"count": THRESHOLD}
+
+
+def test_cursor_batches_are_not_repeats(client, monitor):
+    assert client.get("/downloads", params={"batches": THRESHOLD + 2}).status_code == 200
+    route, = monitor.snapshot()["routes"]
+    # The getMores are attributed to the query that opened the cursor
+    assert route["route"] == "GET /downloads"
+    assert route["shapes"] == [{**route["shapes"][0], "count": THRESHOLD + 3}]
+
+
+def test_warn_mode_only_logs(monitor, capsys):
+    app = FastAPI()
+
+    @app.get("/feedback")
+    def feedback():
+        for user_number in range(THRESHOLD + 1):
+            find(monitor, "users", {"_id": user_number})
+        return {}
+
+    app.add_middleware(NPlusOneMiddleware, threshold=THRESHOLD)
+    app.add_middleware(QueryMonitorMiddleware, monitor=monitor)
+    assert TestClient(app).get("/feedback").status_code == 200
+    assert "[n+1] GET /feedback issued 4x find users" in capsys.readouterr().out
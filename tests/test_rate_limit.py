@@ -0,0 +1,61 @@
+import asyncio
+
+from utils.rate_limit import InMemoryRateLimiter, RateLimitMiddleware, RateLimitPolicy
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def call(middleware, forwarded_for=None, token=None, client=("10.0.0.1", 5000)):
+    headers = []
+    if forwarded_for is not None:
+        headers.append((b"x-forwarded-for", forwarded_for.encode()))
+    if token is not None:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {"type": "http", "method": "POST", "path": "/auth/login", "headers": headers, "client": client}
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    return messages[0]["status"]
+
+
+def make_middleware(trusted_proxies=0, keys=("ip",), burst=2):
+    policy = RateLimitPolicy("login", r"^/auth/login$", rate=0.001, burst=burst, methods=("POST",), keys=keys)
+    limiter = InMemoryRateLimiter()
+    middleware = RateLimitMiddleware(
+        ok_app, limiter, [policy], user_resolver=lambda token: token, trusted_proxies=trusted_proxies
+    )
+    return middleware, limiter
+
+
+def test_forwarded_for_ignored_without_trusted_proxies():
+    middleware, _ = make_middleware()
+    statuses = [call(middleware, forwarded_for=f"1.2.3.{n}") for n in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_spoofed_forwarded_for_entries_do_not_get_fresh_buckets():
+    middleware, _ = make_middleware(trusted_proxies=1)
+    # The load balancer appends the real client (203.0.113.7); the rest is client supplied
+    statuses = [call(middleware, forwarded_for=f"1.2.3.{n}, 203.0.113.7") for n in range(3)]
+    assert statuses == [200, 200, 429]
+    assert call(middleware, forwarded_for="203.0.113.8") == 200
+
+
+def test_trusted_proxy_hops_count_from_the_right():
+    middleware, limiter = make_middleware(trusted_proxies=2)
+    call(middleware, forwarded_for="spoofed, 203.0.113.7, 10.1.1.1")
+    assert "login:ip:203.0.113.7" in limiter._shards[hash("login:ip:203.0.113.7") % 16]
+
+
+def test_rejection_refunds_the_other_buckets():
+    middleware, limiter = make_middleware(keys=("ip", "user"), burst=1)
+    assert call(middleware, token="user-1") == 200
+    # Same user from another address: the user bucket is empty, the new IP bucket is refunded
+    assert call(middleware, token="user-1", client=("10.0.0.2", 5000)) == 429
+    assert call(middleware, token="user-2", client=("10.0.0.2", 5000)) == 200
@@ -0,0 +1,41 @@
+import pytest
+
+USER = {
+    "name": "Asha",
+    "email": "asha@example.com",
+    "password": "$2b$12$abcdefghijklmnopqrstuuvwxyzABCDEFGHIJKLMNOPQRSTUVWXY",
+    "firebase_uid": "firebase-1",
+    "session_generation": 3,
+    "contact_no": "9999999999",
+    "course": "BCA",
+}
+
+FORBIDDEN = ("password", "firebase_uid", "session_generation")
+
+
+@pytest.fixture
+def user_id(client, app_module):
+    result = client.portal.call(app_module.db.users.insert_one, dict(USER))
+    return str(result.inserted_id)
+
+
+@pytest.mark.parametrize("query", ["", "?exclude=course", "?exclude=password", "?exclude=password,course", "?fields=name,email"])
+def test_user_never_returns_forbidden_fields(client, user_id, query):
+    for path in (f"/users/{user_id}", f"/users/email/{USER['email']}"):
+        response = client.get(path + query)
+        assert response.status_code == 200, response.text
+        user = response.json()["user"]
+        assert user["email"] == USER["email"]
+        for name in FORBIDDEN:
+            assert name not in user
+
+
+def test_user_forbidden_fields_cannot_be_selected(client, user_id):
+    for query in ("?fields=password", "?fields=name,session_generation", "?fields=firebase_uid"):
+        assert client.get(f"/users/{user_id}{query}").status_code == 400
+
+
+def test_user_exclude(client, user_id):
+    user = client.get(f"/users/{user_id}?exclude=contact_no,course").json()["user"]
+    assert user["name"] == USER["name"]
+    assert "contact_no" not in user and "course" not in user
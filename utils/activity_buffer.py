@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+
+class SessionActivityBuffer:
+    """
+    Write-behind buffer for user_sessions.last_activity.
+
+    Requests only record a touch in memory; a background loop writes the
+    latest timestamp per session with a single unordered bulk_write every
+    `interval_seconds`. Call `stop()` on shutdown to flush what is left.
+    """
+
+    def __init__(self, collection, interval_seconds: float = 5):
+        self.collection = collection
+        self.interval_seconds = interval_seconds
+        self._pending: Dict[Tuple[str, str], datetime] = {}
+        self._flushed: Dict[Tuple[str, str], datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str, session_id: str, when: Optional[datetime] = None) -> None:
+        """Record activity for a session; nothing is written until the next flush"""
+        when = when or datetime.utcnow()
+        key = (user_id, session_id)
+        current = self._pending.get(key)
+        if current is None or when > current:
+            self._pending[key] = when
+
+    async def flush(self) -> int:
+        """Write pending touches in one bulk_write and return the number of sessions sent"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        operations = []
+        for (user_id, session_id), when in pending.items():
+            # Skip sessions whose timestamp has not moved since the last flush
+            if self._flushed.get((user_id, session_id)) == when:
+                continue
+            operations.append(UpdateOne(
+                {
+                    "user_id": ObjectId(user_id),
+                    "session_id": session_id,
+                    "last_activity": {"$lt": when}
+                },
+                {"$set": {"last_activity": when}}
+            ))
+        if not operations:
+            return 0
+
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception:
+            # Put the touches back so the next cycle retries them
+            for key, when in pending.items():
+                self.touch(key[0], key[1], when)
+            raise
+
+        # Only remember the sessions seen in this cycle to keep the map small
+        self._flushed = pending
+        return len(operations)
+
+    async def run(self) -> None:
+        """Background loop: flush every `interval_seconds` until cancelled"""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[activity] flush failed: {str(e)}")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background loop and flush remaining touches"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,273 @@
+import gzip
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional: Brotli
+    brotli = None
+
+BROTLI_AVAILABLE = brotli is not None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/", "application/javascript", "application/xml")
+
+
+def choose_encoding(accept_encoding: str, brotli_enabled: bool = True) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header (honouring q=0), or None"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli_enabled and BROTLI_AVAILABLE and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+Headers = List[Tuple[bytes, bytes]]
+CacheKey = Tuple[str, str, str]
+
+
+class CompressedBodyCache:
+    """
+    LRU of complete compressed responses (headers and body) keyed by
+    (path and query, content version, encoding), bounded by the total
+    compressed size. Entries expire after `ttl_seconds` in case a version
+    change was missed; a new version simply stops matching the old entries.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[CacheKey, Tuple[Headers, bytes, float]]" = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[Tuple[Headers, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[2] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0], entry[1]
+
+    def put(self, key: CacheKey, headers: Headers, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (headers, body, time.monotonic() + self.ttl_seconds)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: CacheKey) -> None:
+        _, body, _ = self._entries.pop(key)
+        self.size -= len(body)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text/JSON responses of at least `minimum_size`
+    bytes with brotli (when installed) or gzip, as negotiated by Accept-Encoding.
+
+    Complete 200 responses on `cache_paths` are stored in a CompressedBodyCache,
+    compressed at the higher `cached_*` levels since that work is amortised
+    across requests. `cache_version(path)` names the content version the
+    response depends on (None: don't cache); while it is unchanged, repeat
+    requests are answered from the cache without calling the app. Requests
+    with If-None-Match always reach the app, which answers them cheaply.
+    Streamed bodies are compressed chunk by chunk. Strong ETags are weakened
+    on compressed responses.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cached_gzip_level: int = 9,
+        cached_brotli_quality: int = 9,
+        brotli_enabled: bool = True,
+        cache: Optional[CompressedBodyCache] = None,
+        cache_paths: Optional[str] = None,
+        cache_version: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+        self.cached_levels = {"gzip": cached_gzip_level, "br": cached_brotli_quality}
+        self.brotli_enabled = brotli_enabled
+        self.cache = cache
+        self.cache_paths = re.compile(cache_paths) if cache_paths else None
+        self.cache_version = cache_version
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"), self.brotli_enabled)
+        cache_key = self._cache_key(scope, headers, encoding)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached_headers, cached_body = cached
+                await send({"type": "http.response.start", "status": 200, "headers": list(cached_headers)})
+                await send({"type": "http.response.body", "body": cached_body})
+                return
+
+        start_message = None
+        compressor: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is not None:
+                data = compressor.chunk(body) if body else b""
+                if not more_body:
+                    data += compressor.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            # First body message: decide for the whole response
+            response_headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers", []))
+            eligible = self._eligible(start_message["status"], response_headers)
+            if eligible:
+                response_headers = self._add_vary(response_headers)
+            if not eligible or encoding is None or (not more_body and len(body) < self.minimum_size):
+                passthrough = True
+                await send({**start_message, "headers": response_headers})
+                await send(message)
+                return
+
+            response_headers = [
+                (name, value) for name, value in response_headers if name.lower() != b"content-length"
+            ]
+            response_headers = self._weaken_etag(response_headers)
+            response_headers.append((b"content-encoding", encoding.encode()))
+
+            if more_body:
+                compressor = _StreamCompressor(encoding, self.levels[encoding])
+                await send({**start_message, "headers": response_headers})
+                await send({"type": "http.response.body", "body": compressor.chunk(body), "more_body": True})
+                return
+
+            cached_response = cache_key is not None and start_message["status"] == 200
+            level = self.cached_levels[encoding] if cached_response else self.levels[encoding]
+            compressed = compress(body, encoding, level)
+            response_headers.append((b"content-length", str(len(compressed)).encode()))
+            if cached_response:
+                self.cache.put(cache_key, response_headers, compressed)
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _cache_key(self, scope, headers: Dict[bytes, bytes], encoding: Optional[str]) -> Optional[CacheKey]:
+        if encoding is None or self.cache is None or self.cache_paths is None or self.cache_version is None:
+            return None
+        if scope["method"] != "GET" or b"if-none-match" in headers or not self.cache_paths.match(scope["path"]):
+            return None
+        version = self.cache_version(scope["path"])
+        if version is None:
+            return None
+        query = scope.get("query_string", b"").decode("latin-1")
+        return f"{scope['path']}?{query}", version, encoding
+
+    @staticmethod
+    def _eligible(status: int, headers: List[Tuple[bytes, bytes]]) -> bool:
+        if status < 200 or status in (204, 304):
+            return False
+        content_type = b""
+        for name, value in headers:
+            lowered = name.lower()
+            if lowered == b"content-encoding":
+                return False
+            if lowered == b"content-type":
+                content_type = value.lower()
+        return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    headers[index] = (name, value + b", Accept-Encoding")
+                return headers
+        return headers + [(b"vary", b"Accept-Encoding")]
+
+    @staticmethod
+    def _weaken_etag(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+        return [
+            (name, b"W/" + value) if name.lower() == b"etag" and not value.startswith(b"W/") else (name, value)
+            for name, value in headers
+        ]
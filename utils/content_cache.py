@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+Loader = Callable[[], Awaitable[Optional[bytes]]]
+
+
+class _CollectionStats:
+    __slots__ = ("hits", "misses", "invalidations", "expirations", "evictions", "hit_age_total", "hit_age_max")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.hit_age_total = 0.0
+        self.hit_age_max = 0.0
+
+
+class ContentCache:
+    """
+    Read-through cache of encoded response bodies for slow-changing
+    collections, keyed by (collection, key). Entries live for the collection's
+    TTL, the cache is bounded by entry count and total bytes with LRU
+    eviction, and `invalidate(collection)` drops every entry of a collection.
+
+    Concurrent misses for one key share a single load. A load that started
+    before an invalidation of its collection is returned but not stored.
+    Loaders return None for "not found", which is never cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Dict[str, float],
+        default_ttl_seconds: float = 300,
+        max_entries: int = 1000,
+        max_bytes: int = 16 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.default_ttl_seconds = default_ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.size = 0
+        # (collection, key) -> (body, loaded_at, expires_at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, float, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._loading: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._stats: Dict[str, _CollectionStats] = defaultdict(_CollectionStats)
+
+    async def get_or_load(self, collection: str, key: str, loader: Loader) -> Optional[bytes]:
+        if not self.enabled:
+            return await loader()
+        stats = self._stats[collection]
+        entry_key = (collection, key)
+        entry = self._entries.get(entry_key)
+        now = time.monotonic()
+        if entry is not None:
+            body, loaded_at, expires_at = entry
+            if expires_at > now:
+                self._entries.move_to_end(entry_key)
+                age = now - loaded_at
+                stats.hits += 1
+                stats.hit_age_total += age
+                stats.hit_age_max = max(stats.hit_age_max, age)
+                return body
+            self._remove(entry_key)
+            stats.expirations += 1
+
+        stats.misses += 1
+        pending = self._loading.get(entry_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[entry_key] = future
+        generation = self._generations[collection]
+        try:
+            body = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; avoid "exception was never retrieved"
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._loading.pop(entry_key, None)
+        future.set_result(body)
+        if body is not None and generation == self._generations[collection]:
+            self._store(entry_key, body)
+        return body
+
+    def invalidate(self, collection: str) -> None:
+        """Drop every entry of `collection` (and the result of loads in flight)"""
+        self._generations[collection] += 1
+        self._stats[collection].invalidations += 1
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == collection]:
+            self._remove(entry_key)
+
+    def clear(self) -> None:
+        for collection in {entry_key[0] for entry_key in self._entries}:
+            self.invalidate(collection)
+
+    def _store(self, entry_key: Tuple[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        if entry_key in self._entries:
+            self._remove(entry_key)
+        loaded_at = time.monotonic()
+        ttl = self.ttl_seconds.get(entry_key[0], self.default_ttl_seconds)
+        self._entries[entry_key] = (body, loaded_at, loaded_at + ttl)
+        self.size += len(body)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            evicted_key, _ = next(iter(self._entries.items()))
+            self._remove(evicted_key)
+            self._stats[evicted_key[0]].evictions += 1
+
+    def _remove(self, entry_key: Tuple[str, str]) -> None:
+        body, _, _ = self._entries.pop(entry_key)
+        self.size -= len(body)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and age of served entries (how stale hits were) per collection"""
+        collections = {}
+        for collection, stats in sorted(self._stats.items()):
+            lookups = stats.hits + stats.misses
+            collections[collection] = {
+                "entries": sum(1 for entry_key in self._entries if entry_key[0] == collection),
+                "ttl_seconds": self.ttl_seconds.get(collection, self.default_ttl_seconds),
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "hit_ratio": round(stats.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": stats.invalidations,
+                "expirations": stats.expirations,
+                "evictions": stats.evictions,
+                "avg_hit_age_seconds": round(stats.hit_age_total / stats.hits, 3) if stats.hits else 0.0,
+                "max_hit_age_seconds": round(stats.hit_age_max, 3),
+            }
+        hits = sum(stats.hits for stats in self._stats.values())
+        lookups = hits + sum(stats.misses for stats in self._stats.values())
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "collections": collections,
+        }
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
@@ -0,0 +1,87 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Iterable, Tuple
+
+from bson import Timestamp
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class ContentVersions:
+    """
+    Per-collection change counters shared by every worker. Anything derived
+    from a collection is stale once its version moves on.
+
+    Versions live in `collection` (one document per content collection).
+    `bump` increments one after a write made through the API, and the new
+    value is passed to the other workers as a "<collection>:<version>" event
+    for `set`. Changes seen on a change stream (which includes writes made
+    outside the API) are bumped with `bump_for_change`, once per change no
+    matter how many workers observe it.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.loaded = False
+        self._versions: Dict[str, int] = defaultdict(int)
+
+    async def load(self) -> None:
+        """Read the current versions; call once at startup"""
+        async for document in self.collection.find({}):
+            self.set(document["_id"], document.get("version", 0))
+        self.loaded = True
+
+    def get(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self.loaded = False
+
+    def set(self, collection: str, version: int) -> None:
+        """Record a version; never moves a collection backwards"""
+        if version > self._versions.get(collection, 0):
+            self._versions[collection] = version
+
+    async def bump(self, collection: str) -> int:
+        document = await self.collection.find_one_and_update(
+            {"_id": collection},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.set(collection, document["version"])
+        return document["version"]
+
+    async def bump_for_change(self, collection: str, cluster_time: Timestamp) -> None:
+        """Bump for a change stream event; workers seeing the same (or an older) event do nothing"""
+        try:
+            document = await self.collection.find_one_and_update(
+                {"_id": collection, "$or": [{"changed_at": {"$lt": cluster_time}}, {"changed_at": {"$exists": False}}]},
+                {"$inc": {"version": 1}, "$set": {"changed_at": cluster_time}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The document exists and already records this change or a later one
+            return
+        self.set(collection, document["version"])
+
+    def on_version(self, key: str) -> None:
+        """Bus handler for "<collection>:<version>" events"""
+        collection, _, version = key.rpartition(":")
+        self.set(collection, int(version))
+
+    def on_change(self, key: str) -> None:
+        """Bus handler for "<collection>:<cluster time>:<increment>" change stream events"""
+        collection, time, increment = key.rsplit(":", 2)
+        asyncio.get_running_loop().create_task(self._bump_for_change(collection, Timestamp(int(time), int(increment))))
+
+    async def _bump_for_change(self, collection: str, cluster_time: Timestamp) -> None:
+        try:
+            await self.bump_for_change(collection, cluster_time)
+        except Exception as e:
+            print(f"[content] version bump for {collection} failed: {str(e)}")
+
+    def snapshot(self, collections: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(collection, 0) for collection in collections)
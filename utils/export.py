@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from bson import ObjectId
+
+from utils.fieldsets import is_valid_field
+
+CHUNK_SIZE = 64 * 1024
+
+
+def export_value(value: Any) -> Any:
+    """Convert BSON values to JSON/CSV friendly ones"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: export_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [export_value(item) for item in value]
+    return value
+
+
+def _field(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+async def ndjson_chunks(cursor, fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """One JSON object per line, batched into ~CHUNK_SIZE byte chunks"""
+    buffer = io.BytesIO()
+    async for document in cursor:
+        row = {field: export_value(_field(document, field)) for field in fields}
+        buffer.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"))
+        buffer.write(b"\n")
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer = io.BytesIO()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def csv_chunks(cursor, fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """CSV with a header row; nested values are written as JSON"""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(fields)
+    async for document in cursor:
+        row = []
+        for field in fields:
+            value = export_value(_field(document, field))
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            row.append("" if value is None else value)
+        writer.writerow(row)
+        if text.tell() >= CHUNK_SIZE:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Gzip a byte stream on the fly (wbits=31 writes the gzip header/trailer)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def parse_fields(fields: str, default: List[str], forbidden: Sequence[str] = ()) -> List[str]:
+    """Comma separated column list; raises ValueError on malformed or forbidden columns"""
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else list(default)
+    invalid = [field for field in selected if not is_valid_field(field)]
+    if invalid:
+        raise ValueError(f"Invalid fields: {', '.join(invalid)}")
+    blocked = [field for field in selected if field.split(".")[0] in forbidden]
+    if blocked:
+        raise ValueError(f"Fields not exportable: {', '.join(blocked)}")
+    return selected
@@ -0,0 +1,158 @@
+import re
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from fastapi import HTTPException, Query
+
+# A plain or dotted field name; rules out operators ($...) and empty path parts
+FIELD_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+# Present on (almost) every document
+_COMMON_FIELDS = ("_id", "created_at", "updated_at", "is_active")
+
+
+class InvalidFieldset(ValueError):
+    pass
+
+
+def is_valid_field(name: str) -> bool:
+    return FIELD_NAME_RE.match(name) is not None
+
+
+class Fieldset:
+    """
+    Fields of one collection that clients may select with `fields=` or drop
+    with `exclude=`. A dotted path is allowed when its top-level field is.
+    allowed=None accepts any plain field name (collections stored from free-form
+    dicts). `forbidden` fields are never returned: they cannot be selected and
+    are left out of every projection, including the default one.
+    """
+
+    def __init__(self, allowed: Optional[Iterable[str]] = None, forbidden: Iterable[str] = ()):
+        self.allowed: Optional[FrozenSet[str]] = None
+        if allowed is not None:
+            self.allowed = frozenset(allowed) | frozenset(_COMMON_FIELDS)
+        self.forbidden = frozenset(forbidden)
+
+    def _parse(self, value: str, param: str) -> List[str]:
+        names = []
+        for name in (part.strip() for part in value.split(",")):
+            if name and name not in names:
+                names.append(name)
+        invalid = [
+            name for name in names
+            if not is_valid_field(name)
+            or (param == "fields" and name.split(".")[0] in self.forbidden)
+            or (
+                self.allowed is not None
+                and name.split(".")[0] not in self.allowed
+                and name.split(".")[0] not in self.forbidden
+            )
+        ]
+        if invalid:
+            raise InvalidFieldset(f"Unknown or disallowed {param}: {', '.join(invalid)}")
+        return names
+
+    def projection(self, fields: Optional[str] = None, exclude: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """Mongo projection for the request, or None to return whole documents"""
+        if fields and exclude:
+            raise InvalidFieldset("Use either fields or exclude, not both")
+        if fields:
+            return {name: 1 for name in _drop_sub_paths(self._parse(fields, "fields"))}
+        names = self._parse(exclude, "exclude") if exclude else []
+        names = _drop_sub_paths(names + [name for name in sorted(self.forbidden) if name not in names])
+        return {name: 0 for name in names} or None
+
+
+def _drop_sub_paths(names: List[str]) -> List[str]:
+    # MongoDB rejects a path together with one of its sub-paths
+    return [
+        name for name in names
+        if not any(name.startswith(other + ".") for other in names if other != name)
+    ]
+
+
+def narrow_projection(base: Dict[str, int], projection: Optional[Dict[str, int]]) -> Dict[str, int]:
+    """Apply a requested projection to the inclusion projection a handler already uses"""
+    if not projection:
+        return base
+    if any(projection.values()):
+        return projection
+    return {name: value for name, value in base.items() if name not in projection}
+
+
+_USER_FORBIDDEN = ("password", "firebase_uid", "google_sub", "session_generation")
+
+FIELDSETS: Dict[str, Fieldset] = {
+    "users": Fieldset(
+        ["name", "email", "contact_no", "gender", "dob", "education", "course", "photo_url", "provider", "last_login"],
+        forbidden=_USER_FORBIDDEN,
+    ),
+    "institutions": Fieldset(["name", "description", "vision", "mission"]),
+    "testimonials": Fieldset(
+        ["title", "description", "student_name", "course", "rating", "media_type", "media_url", "student_image", "is_featured"]
+    ),
+    "courses": Fieldset(
+        [
+            "name", "title", "description", "category", "sub_category", "start_date", "end_date", "duration",
+            "instructor", "price", "thumbnail_image", "enrolled_students", "status", "is_featured", "feedback",
+        ]
+    ),
+    "materials": Fieldset(
+        [
+            "class_name", "course", "subject", "sub_category", "module", "title", "description", "academic_year",
+            "time_period", "price", "file_url", "file_size", "sample_images", "download_count", "tags", "feedback",
+        ]
+    ),
+    "online_tests": Fieldset(
+        [
+            "class_name", "course", "sub_category", "subject", "module", "test_title", "description",
+            "total_questions", "total_marks", "duration", "difficulty_level", "pass_mark", "validity_days", "price",
+            "date_published", "result_type", "answer_key", "tags", "attempts_count", "feedback",
+        ]
+    ),
+    "test_questions": Fieldset(
+        [
+            "test_id", "question_number", "question", "options", "correct_answer", "explanation", "marks",
+            "image_url", "description_images", "difficulty_level", "tags",
+        ]
+    ),
+    "user_test_attempts": Fieldset(
+        [
+            "user_id", "test_id", "attempt_number", "start_time", "end_time", "answers", "total_marks_obtained",
+            "percentage", "result", "status",
+        ]
+    ),
+    "notifications": Fieldset(["title", "message", "type", "target_audience", "priority", "read_by"]),
+    "current_affairs": Fieldset(
+        ["title", "content", "category", "publish_date", "importance", "tags", "view_count", "likes", "is_featured"]
+    ),
+    "user_downloads": Fieldset(["user_id", "material_id", "download_count", "last_download_at"]),
+    "user_enrollments": Fieldset(
+        [
+            "user_id", "course_id", "enrollment_date", "status", "progress", "payment_status", "amount_paid",
+            "certificate_issued",
+        ]
+    ),
+    "youtube_videos": Fieldset(["title", "youtube_url", "description"]),
+    "text_slider": Fieldset(["text"]),
+    # Stored from free-form request bodies
+    "contacts": Fieldset(),
+    "terms_conditions": Fieldset(),
+    "user_contact_messages": Fieldset(),
+}
+
+
+def fieldset_projection(collection: str) -> Callable[..., Optional[Dict[str, int]]]:
+    """FastAPI dependency turning `fields=a,b` / `exclude=c` into a projection for `collection`"""
+    fieldset = FIELDSETS[collection]
+
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+        exclude: Optional[str] = Query(None, description="Comma-separated fields to leave out"),
+    ) -> Optional[Dict[str, int]]:
+        try:
+            return fieldset.projection(fields, exclude)
+        except InvalidFieldset as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return dependency
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+from urllib import request as urlrequest
+
+import jwt
+
+DEFAULT_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+DEFAULT_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+FIREBASE_JWKS_URL = "https://www.googleapis.com/service_accounts/v1/jwk/securetoken@system.gserviceaccount.com"
+
+
+def firebase_issuer(project_id: str) -> str:
+    return f"https://securetoken.google.com/{project_id}"
+
+
+class GoogleTokenError(Exception):
+    pass
+
+
+def _fetch_jwks(url: str) -> Tuple[Dict[str, Any], Optional[int]]:
+    """Download a JWKS document; returns (jwks, max_age seconds from Cache-Control)"""
+    req = urlrequest.Request(url, method="GET")
+    req.add_header("Accept", "application/json")
+    with urlrequest.urlopen(req, timeout=20) as resp:
+        jwks = json.loads(resp.read().decode("utf-8"))
+        match = re.search(r"max-age=(\d+)", resp.headers.get("Cache-Control", ""))
+    return jwks, int(match.group(1)) if match else None
+
+
+class GoogleKeySet:
+    """
+    Google's public signing keys, cached in memory and on disk.
+
+    Keys come from `local_file` when set (offline/tests, re-read instead of
+    fetched), otherwise from `jwks_url`. Fetched sets are written to
+    `cache_file` so a restart does not need the network. `run()` refreshes on
+    the schedule Google advertises (Cache-Control max-age), and `get_key`
+    refreshes early when it sees an unknown `kid`, at most once per
+    `min_refresh_seconds`.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str = DEFAULT_JWKS_URL,
+        cache_file: Optional[str] = None,
+        local_file: Optional[str] = None,
+        refresh_seconds: float = 3600,
+        min_refresh_seconds: float = 60,
+    ):
+        self.jwks_url = jwks_url
+        self.cache_file = cache_file
+        self.local_file = local_file
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+        path = local_file or cache_file
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._load(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"[google-keys] could not read {path}: {str(e)}")
+
+    def _load(self, jwks: Dict[str, Any], max_age: Optional[int] = None) -> None:
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("kid"):
+                keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+        self._keys = keys
+        self._expires_at = time.time() + (max_age or self.refresh_seconds)
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            if time.monotonic() - self._fetched_at < self.min_refresh_seconds and self._keys:
+                return
+            if self.local_file:
+                with open(self.local_file, "r", encoding="utf-8") as f:
+                    self._load(json.load(f))
+                self._fetched_at = time.monotonic()
+                return
+            jwks, max_age = await asyncio.to_thread(_fetch_jwks, self.jwks_url)
+            self._load(jwks, max_age)
+            self._fetched_at = time.monotonic()
+            if self.cache_file:
+                os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+                tmp_path = f"{self.cache_file}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(jwks, f)
+                os.replace(tmp_path, self.cache_file)
+
+    async def get_key(self, kid: str):
+        key = self._keys.get(kid)
+        if key is None or (not self.local_file and time.time() >= self._expires_at):
+            try:
+                await self.refresh()
+            except Exception as e:
+                if key is None:
+                    raise GoogleTokenError(f"could not load Google signing keys: {str(e)}")
+            key = self._keys.get(kid)
+        if key is None:
+            raise GoogleTokenError("unknown signing key")
+        return key
+
+    async def run(self) -> None:
+        """Background loop keeping the key set fresh"""
+        if self.local_file:
+            return
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[google-keys] refresh failed: {str(e)}")
+            await asyncio.sleep(max(self.min_refresh_seconds, self._expires_at - time.time()))
+
+
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens (RS256) against a GoogleKeySet, and Firebase ID
+    tokens of `firebase_project_id` against `firebase_key_set` when set.
+
+    A Google token is only accepted for one of `audiences` and a Firebase token
+    only for its project (tokens issued to other apps prove nothing about our
+    users), so verification is refused while neither is configured. Tokens
+    must carry a verified `email`. The `sub` of a Firebase token is the
+    Firebase UID; that of a Google token is the Google account ID.
+    """
+
+    def __init__(
+        self,
+        key_set: GoogleKeySet,
+        audiences: Sequence[str] = (),
+        issuers: Sequence[str] = DEFAULT_ISSUERS,
+        firebase_project_id: Optional[str] = None,
+        firebase_key_set: Optional[GoogleKeySet] = None,
+    ):
+        self.key_set = key_set
+        self.audiences = list(audiences)
+        self.issuers = set(issuers)
+        self.firebase_project_id = firebase_project_id
+        self.firebase_key_set = firebase_key_set
+        self.firebase_issuer = firebase_issuer(firebase_project_id) if firebase_project_id else None
+
+    def is_firebase(self, claims: Dict[str, Any]) -> bool:
+        return self.firebase_issuer is not None and claims.get("iss") == self.firebase_issuer
+
+    async def verify(self, id_token: str) -> Dict[str, Any]:
+        if not self.audiences and not self.firebase_issuer:
+            raise GoogleTokenError("no Google client IDs or Firebase project configured")
+        try:
+            header = jwt.get_unverified_header(id_token)
+            issuer = jwt.decode(id_token, options={"verify_signature": False}).get("iss")
+        except jwt.InvalidTokenError as e:
+            raise GoogleTokenError(f"malformed token: {str(e)}")
+        if header.get("alg") != "RS256" or not header.get("kid"):
+            raise GoogleTokenError("unexpected token header")
+
+        # The issuer picks the key set and audience; both are checked again below
+        if issuer == self.firebase_issuer:
+            key_set, audiences, issuers = self.firebase_key_set or self.key_set, [self.firebase_project_id], {issuer}
+        else:
+            key_set, audiences, issuers = self.key_set, self.audiences, self.issuers
+        if not audiences:
+            raise GoogleTokenError("no Google client IDs configured")
+
+        key = await key_set.get_key(header["kid"])
+        try:
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=["RS256"],
+                audience=audiences,
+                options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+            )
+        except jwt.InvalidTokenError as e:
+            raise GoogleTokenError(str(e))
+        if claims.get("iss") not in issuers:
+            raise GoogleTokenError("unexpected issuer")
+        if not claims.get("email"):
+            raise GoogleTokenError("token has no email")
+        if claims.get("email_verified") is not True:
+            raise GoogleTokenError("email is not verified")
+        return claims
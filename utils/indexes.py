@@ -0,0 +1,176 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+# Error code for "an index with this name/keys exists with different options"
+INDEX_OPTIONS_CONFLICT = 85
+
+
+class IndexSpec:
+    """One index the application relies on; `options` are passed to create_index"""
+
+    def __init__(self, collection: str, keys: Sequence[Tuple[str, int]], name: str, **options: Any):
+        self.collection = collection
+        self.keys = list(keys)
+        self.name = name
+        self.options = options
+
+
+class QueryShape:
+    """
+    A hot query, with representative values, that must be served by an index.
+    `check_query_shapes` explains each one and flags collection scans.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collection: str,
+        filter: Dict[str, Any],
+        sort: Optional[Sequence[Tuple[str, int]]] = None,
+    ):
+        self.name = name
+        self.collection = collection
+        self.filter = filter
+        self.sort = list(sort) if sort else None
+
+
+def app_indexes(session_ttl_seconds: int = 30 * 24 * 3600) -> List[IndexSpec]:
+    newest_first = [("created_at", DESCENDING), ("_id", DESCENDING)]
+    return [
+        # Login / registration / Google sign-in lookups. Not unique: older data may hold duplicates.
+        IndexSpec("users", [("email", ASCENDING)], "users_email"),
+        IndexSpec("users", [("firebase_uid", ASCENDING)], "users_firebase_uid", sparse=True),
+        IndexSpec("users", [("google_sub", ASCENDING)], "users_google_sub", sparse=True),
+        # GET /users pagination and filters
+        IndexSpec("users", newest_first, "users_created"),
+        IndexSpec("users", [("course", ASCENDING)] + newest_first, "users_course_created"),
+        IndexSpec("users", [("education", ASCENDING)] + newest_first, "users_education_created"),
+        IndexSpec("users", [("provider", ASCENDING)] + newest_first, "users_provider_created"),
+
+        # Session validation and logout
+        IndexSpec(
+            "user_sessions",
+            [("user_id", ASCENDING), ("session_id", ASCENDING), ("is_active", ASCENDING)],
+            "user_session_lookup",
+        ),
+        # Takeover and "end all sessions" ({user_id, is_active}); on user_session_lookup
+        # is_active sits behind session_id, so those would scan every ended session too
+        IndexSpec("user_sessions", [("user_id", ASCENDING), ("is_active", ASCENDING)], "user_active_sessions"),
+        # Active sessions have ended_at = None, which TTL indexes ignore
+        IndexSpec("user_sessions", [("ended_at", ASCENDING)], "ended_sessions_ttl", expireAfterSeconds=session_ttl_seconds),
+        IndexSpec("user_session_summaries", [("user_id", ASCENDING)], "user_id", unique=True),
+
+        IndexSpec("test_questions", [("test_id", ASCENDING)], "test_questions_test"),
+        IndexSpec("user_test_attempts", [("user_id", ASCENDING), ("created_at", DESCENDING)], "attempts_user"),
+        IndexSpec("user_test_attempts", [("created_at", DESCENDING)], "attempts_created"),
+        IndexSpec("user_downloads", [("user_id", ASCENDING), ("material_id", ASCENDING)], "downloads_user_material"),
+        IndexSpec("user_downloads", [("material_id", ASCENDING)], "downloads_material"),
+        IndexSpec("user_enrollments", [("user_id", ASCENDING), ("course_id", ASCENDING)], "enrollments_user_course"),
+        IndexSpec("user_enrollments", [("course_id", ASCENDING)], "enrollments_course"),
+        IndexSpec("user_enrollments", [("created_at", DESCENDING)], "enrollments_created"),
+
+        # Payment polling (pending links of the last 20 minutes) and history listings
+        IndexSpec("payment_links", [("status", ASCENDING), ("created_at", DESCENDING)], "payment_links_status_created"),
+        IndexSpec("payment_links", [("user_id", ASCENDING), ("created_at", DESCENDING)], "payment_links_user_created"),
+        IndexSpec("payment_links", [("created_at", DESCENDING)], "payment_links_created"),
+        IndexSpec("payment_links", [("link_id", ASCENDING), ("gateway", ASCENDING)], "payment_links_link"),
+        IndexSpec("payment_links", [("payment_id", ASCENDING)], "payment_links_payment", sparse=True),
+        IndexSpec("payment_status", [("payment_id", ASCENDING)], "payment_status_payment"),
+    ]
+
+
+# Indexes replaced by entries above; dropped when the registry is applied
+RETIRED_INDEXES: List[Tuple[str, str]] = []
+
+
+def app_query_shapes() -> List[QueryShape]:
+    some_id = ObjectId()
+    return [
+        QueryShape("login by email", "users", {"email": "student@example.com"}),
+        QueryShape("google sign-in", "users", {"firebase_uid": "uid"}),
+        QueryShape("google sign-in by google account", "users", {"google_sub": "sub"}),
+        QueryShape("users page", "users", {}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+        QueryShape("users by course", "users", {"course": "course"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+        QueryShape("active session", "user_sessions", {"user_id": some_id, "session_id": "sid", "is_active": True}),
+        QueryShape("user's active sessions", "user_sessions", {"user_id": some_id, "is_active": True}),
+        QueryShape("questions of a test", "test_questions", {"test_id": some_id}),
+        QueryShape("attempts of a user", "user_test_attempts", {"user_id": some_id}),
+        QueryShape("download of a material by a user", "user_downloads", {"user_id": some_id, "material_id": some_id}),
+        QueryShape("downloads of a material", "user_downloads", {"material_id": some_id}),
+        QueryShape("enrollment of a user in a course", "user_enrollments", {"user_id": some_id, "course_id": some_id}),
+        QueryShape("enrollments of a course", "user_enrollments", {"course_id": some_id}),
+        QueryShape(
+            "pending payment links",
+            "payment_links",
+            {"status": {"$in": ["created", "pending", "issued", "active"]}, "created_at": {"$gte": datetime.utcnow()}},
+        ),
+        QueryShape("payment links of a user", "payment_links", {"user_id": some_id}, [("created_at", DESCENDING)]),
+        QueryShape("payment status by id", "payment_status", {"payment_id": "plink_x"}),
+    ]
+
+
+async def ensure_indexes(db, specs: Sequence[IndexSpec], retired: Sequence[Tuple[str, str]] = ()) -> List[str]:
+    """
+    Create every index in `specs` (no-op for existing ones). A changed TTL is
+    applied in place with collMod. Returns a list of failures; one bad index
+    does not stop the others.
+    """
+    failures = []
+    for spec in specs:
+        try:
+            await db[spec.collection].create_index(spec.keys, name=spec.name, **spec.options)
+        except OperationFailure as e:
+            if e.code == INDEX_OPTIONS_CONFLICT and "expireAfterSeconds" in spec.options:
+                try:
+                    await db.command({
+                        "collMod": spec.collection,
+                        "index": {"name": spec.name, "expireAfterSeconds": spec.options["expireAfterSeconds"]},
+                    })
+                    continue
+                except OperationFailure as mod_error:
+                    e = mod_error
+            failures.append(f"{spec.collection}.{spec.name}: {str(e)}")
+        except Exception as e:
+            failures.append(f"{spec.collection}.{spec.name}: {str(e)}")
+
+    for collection, name in retired:
+        try:
+            await db[collection].drop_index(name)
+        except OperationFailure:
+            # Already gone (or the collection does not exist yet)
+            pass
+    return failures
+
+
+def _has_collscan(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(item) for item in plan)
+    return False
+
+
+async def check_query_shapes(db, shapes: Sequence[QueryShape]) -> List[Tuple[QueryShape, Optional[str]]]:
+    """
+    Explain each query shape. Returns (shape, problem) pairs where problem is
+    None for shapes served by an index.
+    """
+    results = []
+    for shape in shapes:
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        try:
+            explain = await cursor.explain()
+        except Exception as e:
+            results.append((shape, f"explain failed: {str(e)}"))
+            continue
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        results.append((shape, "COLLSCAN" if _has_collscan(winning_plan) else None))
+    return results
@@ -0,0 +1,189 @@
+import asyncio
+import glob
+import json
+import os
+import socket
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import OperationFailure
+
+Handler = Callable[[str], None]
+
+
+class InvalidationBus:
+    """
+    Fans out "(topic, key) changed" events, e.g. ("user_sessions", user_id),
+    to every worker so per-process caches can drop stale entries.
+
+    `publish` runs local handlers immediately and hands the event to the
+    transport for the other workers; the transport calls `dispatch` when an
+    event arrives from elsewhere.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self.transport = None
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers[topic].append(handler)
+
+    def dispatch(self, topic: str, key: str) -> None:
+        """Run local handlers for an event"""
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                print(f"[bus] handler for {topic} failed: {str(e)}")
+
+    def publish(self, topic: str, key: str) -> None:
+        """Invalidate locally and notify the other workers"""
+        self.dispatch(topic, key)
+        if self.transport is not None:
+            self.transport.send(topic, key)
+
+    async def start(self, transport) -> None:
+        await transport.start(self)
+        self.transport = transport
+
+    async def stop(self) -> None:
+        if self.transport is not None:
+            await self.transport.stop()
+            self.transport = None
+
+
+class UnixSocketTransport:
+    """
+    Same-host fallback: every worker binds a datagram socket in `directory`
+    and publishing sends the event to every other socket found there.
+    Sockets left behind by dead workers are removed when a send is refused.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(directory, f"{self.origin}.sock")
+        self._sock: Optional[socket.socket] = None
+        self._bus: Optional[InvalidationBus] = None
+
+    async def start(self, bus: InvalidationBus) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(self.path)
+        self._sock = sock
+        self._bus = bus
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            if message.get("origin") != self.origin:
+                self._bus.dispatch(message["topic"], message["key"])
+
+    def send(self, topic: str, key: str) -> None:
+        if self._sock is None:
+            return
+        payload = json.dumps({"origin": self.origin, "topic": topic, "key": key}).encode("utf-8")
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            if path == self.path:
+                continue
+            try:
+                self._sock.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                print(f"[bus] peer {os.path.basename(path)} is not draining, dropped {topic} event")
+            except OSError as e:
+                print(f"[bus] send to {os.path.basename(path)} failed: {str(e)}")
+
+    async def stop(self) -> None:
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class ChangeStreamTransport:
+    """
+    Derives events from MongoDB change streams, so every worker (and any other
+    writer) sees them without explicit sends. Requires a replica set; `start`
+    raises OperationFailure on a standalone server.
+
+    Register streams with `watch` before starting; `key_fn` maps a change
+    document to the event key, or None to skip it.
+    """
+
+    def __init__(self, retry_seconds: float = 5):
+        self.retry_seconds = retry_seconds
+        self._watches: List[Tuple[Any, str, List[dict], Callable[[dict], Optional[str]], Optional[str]]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def watch(
+        self,
+        collection,
+        topic: str,
+        pipeline: List[dict],
+        key_fn: Callable[[dict], Optional[str]],
+        full_document: Optional[str] = None,
+    ) -> None:
+        self._watches.append((collection, topic, pipeline, key_fn, full_document))
+
+    async def start(self, bus: InvalidationBus) -> None:
+        for collection, _, pipeline, _, full_document in self._watches:
+            # Open once up front so an unsupported deployment fails here, not in the background
+            async with collection.watch(pipeline, full_document=full_document):
+                pass
+        for watch in self._watches:
+            self._tasks.append(asyncio.create_task(self._run(bus, *watch)))
+
+    async def _run(self, bus, collection, topic, pipeline, key_fn, full_document) -> None:
+        resume_token = None
+        while True:
+            try:
+                async with collection.watch(pipeline, full_document=full_document, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        key = key_fn(change)
+                        if key is not None:
+                            bus.dispatch(topic, key)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # e.g. the resume token fell off the oplog; start over from now
+                print(f"[bus] change stream on {collection.name} failed: {str(e)}")
+                resume_token = None
+                await asyncio.sleep(self.retry_seconds)
+            except Exception as e:
+                print(f"[bus] change stream on {collection.name} interrupted: {str(e)}")
+                await asyncio.sleep(self.retry_seconds)
+
+    def send(self, topic: str, key: str) -> None:
+        # The database write itself produces the event for the other workers
+        pass
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
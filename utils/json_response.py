@@ -0,0 +1,30 @@
+from typing import Any
+
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    # datetime, date, UUID, dict, list... are handled natively by orjson
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode raw Motor documents (ObjectId, datetime) in one pass; output matches serialize_object"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-backed JSON response. Returning one directly from a handler also
+    skips FastAPI's jsonable_encoder, so handlers can pass database documents
+    as they come from the cursor instead of running serialize_object on them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
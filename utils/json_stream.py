@@ -0,0 +1,48 @@
+from typing import Any, AsyncIterator, List
+
+from fastapi.responses import Response, StreamingResponse
+
+from utils.json_response import dumps
+
+BATCH_SIZE = 500
+
+
+async def json_array_chunks(key: str, cursor, first: List[Any], batch_size: int = BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    b'{"<key>":[doc,doc,...]}' one cursor batch at a time, starting with the
+    already fetched `first` batch. Only one batch is held in memory, and the
+    bytes match FastJSONResponse({key: every document}).
+
+    The status line has gone out before the later batches are read, so a
+    failure part way through can only end the response early: the body is
+    then truncated, invalid JSON under a 200. Clients must treat a body that
+    does not parse as a failed request. The cursor is closed either way.
+    """
+    try:
+        yield b'{' + dumps(key) + b':['
+        documents = first
+        separator = b''
+        while documents:
+            # One orjson call per batch; strip the list's brackets
+            yield separator + dumps(documents)[1:-1]
+            separator = b','
+            documents = await cursor.to_list(batch_size)
+        yield b']}'
+    except Exception as e:
+        print(f"[json_stream] streaming {key} failed, response truncated: {str(e)}")
+        raise
+    finally:
+        await cursor.close()
+
+
+async def json_array_response(key: str, cursor, batch_size: int = BATCH_SIZE) -> Response:
+    """
+    {key: [documents]} for a Motor cursor without building the whole list.
+    The first batch is read before responding, so query errors still become
+    normal error responses; results that fit in it are sent in one piece.
+    """
+    cursor.batch_size(batch_size)
+    first = await cursor.to_list(batch_size)
+    if len(first) < batch_size:
+        return Response(content=dumps({key: first}), media_type="application/json")
+    return StreamingResponse(json_array_chunks(key, cursor, first, batch_size), media_type="application/json")
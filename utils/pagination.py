@@ -0,0 +1,104 @@
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import Decimal128, ObjectId, json_util
+from pymongo import DESCENDING
+
+
+# Sort key values a cursor may carry. Dicts could smuggle in query operators
+# ({"$ne": null}) and regular expressions match by pattern, so neither is allowed.
+CURSOR_VALUE_TYPES = (str, int, float, bool, datetime, ObjectId, Decimal128, type(None))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor holding the sort key values of the last document"""
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    The values of an encode_cursor cursor. Cursors come from the client and
+    their values are used as-is in filters, so anything but a plain
+    CURSOR_VALUE_TYPES value is rejected.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(raw.decode("utf-8"))
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, dict) or not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values.values()):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def keyset_query(sort: Sequence[Tuple[str, int]], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Filter selecting the documents that come after `after` in `sort` order,
+    e.g. for [(created_at, -1), (_id, -1)]:
+    created_at < v1 OR (created_at == v1 AND _id < v2).
+    The last sort field must be unique (normally _id).
+    """
+    branches = []
+    for index, (field, direction) in enumerate(sort):
+        if field not in after:
+            raise InvalidCursor("Invalid cursor")
+        branch = {prev: after[prev] for prev, _ in sort[:index]}
+        branch[field] = {"$lt" if direction == DESCENDING else "$gt": after[field]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def page_filter(query: Dict[str, Any], sort: Sequence[Tuple[str, int]], cursor: Optional[str]) -> Dict[str, Any]:
+    """`query` restricted to the documents after `cursor`; raises InvalidCursor"""
+    if not cursor:
+        return query
+    after = keyset_query(sort, decode_cursor(cursor))
+    return {"$and": [query, after]} if query else after
+
+
+def page_projection(projection: Optional[Dict[str, Any]], sort: Sequence[Tuple[str, int]]) -> Optional[Dict[str, Any]]:
+    """`projection` keeping the sort keys, which are needed to build the next cursor"""
+    if not projection:
+        return projection
+    sort_fields = [field for field, _ in sort]
+    if any(projection.values()):
+        return {**projection, **{field: 1 for field in sort_fields}}
+    projection = {field: value for field, value in projection.items() if field not in sort_fields}
+    return projection or None
+
+
+def split_page(
+    documents: List[Any], sort: Sequence[Tuple[str, int]], limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """(page, next_cursor) from up to limit + 1 documents fetched in `sort` order"""
+    # The extra document tells us whether another page exists without a count
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    last = documents[-1]
+    return documents, encode_cursor({field: last.get(field) for field, _ in sort})
+
+
+async def paginate(
+    collection,
+    query: Dict[str, Any],
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of `collection` in `sort` order.
+    Returns (documents, next_cursor); next_cursor is None on the last page.
+    Raises InvalidCursor for a cursor that cannot be decoded.
+    """
+    query = page_filter(query, sort, cursor)
+    projection = page_projection(projection, sort)
+    documents = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    return split_page(documents, sort, limit)
@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import hmac
+import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+_HEX_DIGITS = set(string.hexdigits)
+
+
+def is_legacy_sha256(hashed_password: str) -> bool:
+    """Passwords stored before bcrypt are bare SHA-256 hex digests"""
+    return len(hashed_password) == 64 and all(c in _HEX_DIGITS for c in hashed_password)
+
+
+def legacy_sha256(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+class PasswordHasher:
+    """
+    Runs slow password hashing (bcrypt via passlib) on a bounded thread pool so
+    login and registration never block the event loop.
+
+    At most `max_workers` hashes run at once; extra requests wait in the pool
+    queue. bcrypt releases the GIL, so threads give real parallelism.
+    """
+
+    def __init__(self, context, max_workers: int = 4):
+        self.context = context
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current default scheme"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, bool]:
+        """
+        Check a password against a stored hash.
+        Returns (valid, needs_rehash); legacy SHA-256 hashes always need a rehash.
+        """
+        if not hashed_password:
+            return False, False
+        if is_legacy_sha256(hashed_password):
+            valid = hmac.compare_digest(legacy_sha256(password), hashed_password.lower())
+            return valid, valid
+        loop = asyncio.get_running_loop()
+        try:
+            valid, new_hash = await loop.run_in_executor(
+                self._executor, self.context.verify_and_update, password, hashed_password
+            )
+        except ValueError:
+            # Unrecognised hash format
+            return False, False
+        return valid, valid and new_hash is not None
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
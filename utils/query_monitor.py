@@ -0,0 +1,298 @@
+import json
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from pymongo import monitoring
+
+BACKGROUND_LABEL = "(background)"
+
+# Commands that are driver/connection housekeeping rather than application queries
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "saslStart", "saslContinue",
+    "endSessions", "killCursors", "getLastError", "listIndexes", "createIndexes",
+}
+
+# Which part of each command holds its filter
+FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "delete": "deletes",
+    "update": "updates",
+}
+
+
+def _shape(value: Any) -> Any:
+    """Replace literal values by placeholders, keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [_shape(item) for item in value]
+        return "?"
+    return "?"
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> str:
+    """e.g. 'find users {"email": "?"} sort={"created_at": "?"}'"""
+    collection = command.get(command_name)
+    if not isinstance(collection, str):
+        collection = ""
+    if command_name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            name = next(iter(stage), "?")
+            stages.append({name: _shape(stage[name])} if name == "$match" else name)
+        detail = json.dumps(stages, sort_keys=True, default=str)
+    elif command_name in ("update", "delete"):
+        statements = command.get(FILTER_FIELDS[command_name]) or [{}]
+        detail = json.dumps(_shape(statements[0].get("q", {})), sort_keys=True, default=str)
+    elif command_name in FILTER_FIELDS:
+        detail = json.dumps(_shape(command.get(FILTER_FIELDS[command_name]) or {}), sort_keys=True, default=str)
+        if command.get("sort"):
+            detail += " sort=" + json.dumps(_shape(command["sort"]), sort_keys=True, default=str)
+    else:
+        detail = ""
+    return f"{command_name} {collection} {detail}".strip()
+
+
+def _returned_documents(command_name: str, reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    if command_name in ("count", "update", "delete", "insert"):
+        return int(reply.get("n", 0))
+    return 0
+
+
+class RequestQueries:
+    """Commands issued while serving one request"""
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None):
+        self.scope = scope
+        self.commands: List[Dict[str, Any]] = []
+        self.started_at = time.perf_counter()
+
+    @property
+    def label(self) -> str:
+        return route_label(self.scope) if self.scope is not None else BACKGROUND_LABEL
+
+    def shape_counts(self) -> Dict[str, int]:
+        """How often each query shape was issued (cursor continuation batches not counted)"""
+        counts: Dict[str, int] = {}
+        for command in self.commands:
+            if not command.get("batch"):
+                counts[command["shape"]] = counts.get(command["shape"], 0) + 1
+        return counts
+
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+
+def current_request_queries() -> Optional[RequestQueries]:
+    return _current_request.get()
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """'GET /users/{user_id}'; requests that matched no route share one label"""
+    path = getattr(scope.get("route"), "path", None) or "(unmatched)"
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class QueryMonitor(monitoring.CommandListener):
+    """
+    PyMongo command listener aggregating Mongo usage per route and query shape.
+
+    Pass it to the client via `event_listeners=[monitor]` and wrap the app in
+    QueryMonitorMiddleware. Commands taking at least `slow_ms` are logged and
+    kept in a ring buffer of the `slow_log_size` most recent ones.
+    """
+
+    def __init__(self, slow_ms: float = 100, slow_log_size: int = 200, max_shapes_per_route: int = 100):
+        self.slow_ms = slow_ms
+        self.max_shapes_per_route = max_shapes_per_route
+        self.slow_log: deque = deque(maxlen=slow_log_size)
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[int, tuple] = {}
+        self._cursor_shapes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    # CommandListener callbacks run on the driver's (executor) threads
+
+    def started(self, event) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        cursor_id = None
+        if event.command_name == "getMore":
+            # Attribute batches to the query that opened the cursor
+            cursor_id = event.command.get("getMore")
+            shape = self._cursor_shapes.get(cursor_id) or f"getMore {event.command.get('collection', '')}"
+        else:
+            shape = query_shape(event.command_name, event.command)
+        with self._lock:
+            self._pending[event.request_id] = (shape, _current_request.get(), cursor_id)
+
+    def succeeded(self, event) -> None:
+        self._finish(event, _returned_documents(event.command_name, event.reply or {}), event.reply)
+
+    def failed(self, event) -> None:
+        self._finish(event, 0, None)
+
+    def _finish(self, event, documents: int, reply: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            pending = self._pending.pop(event.request_id, None)
+        if pending is None:
+            return
+        shape, request, cursor_id = pending
+        duration_ms = event.duration_micros / 1000
+
+        cursor = (reply or {}).get("cursor")
+        if isinstance(cursor, dict):
+            with self._lock:
+                if cursor.get("id"):
+                    if len(self._cursor_shapes) >= 10000:
+                        # Cursors closed by killCursors are never seen again; start over
+                        self._cursor_shapes.clear()
+                    self._cursor_shapes[cursor["id"]] = shape
+                elif cursor_id is not None:
+                    self._cursor_shapes.pop(cursor_id, None)
+
+        command = {"shape": shape, "duration_ms": duration_ms, "documents": documents, "batch": cursor_id is not None}
+        if request is not None:
+            request.commands.append(command)
+        else:
+            with self._lock:
+                self._record(BACKGROUND_LABEL, [command], count_request=False)
+
+        if duration_ms >= self.slow_ms:
+            label = request.label if request is not None else BACKGROUND_LABEL
+            self.slow_log.append({
+                "route": label,
+                "shape": shape,
+                "duration_ms": round(duration_ms, 2),
+                "documents": documents,
+                "at": time.time(),
+            })
+            print(f"[queries] slow {duration_ms:.1f}ms {label} | {shape} | {documents} docs")
+
+    def finish_request(self, request: RequestQueries) -> None:
+        """Fold a finished request's commands into the per-route totals"""
+        label = request.label
+        with self._lock:
+            self._record(label, request.commands, count_request=True)
+        total_ms = sum(command["duration_ms"] for command in request.commands)
+        if total_ms >= self.slow_ms:
+            print(f"[queries] {label}: {len(request.commands)} commands, {total_ms:.1f}ms in MongoDB")
+
+    def _record(self, label: str, commands: List[Dict[str, Any]], count_request: bool) -> None:
+        route = self._routes.setdefault(label, {
+            "requests": 0, "commands": 0, "total_ms": 0.0, "max_ms": 0.0, "documents": 0, "shapes": {},
+        })
+        if count_request:
+            route["requests"] += 1
+        for command in commands:
+            route["commands"] += 1
+            route["total_ms"] += command["duration_ms"]
+            route["max_ms"] = max(route["max_ms"], command["duration_ms"])
+            route["documents"] += command["documents"]
+            shape = route["shapes"].get(command["shape"])
+            if shape is None:
+                if len(route["shapes"]) >= self.max_shapes_per_route:
+                    continue
+                shape = route["shapes"][command["shape"]] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "documents": 0}
+            shape["count"] += 1
+            shape["total_ms"] += command["duration_ms"]
+            shape["max_ms"] = max(shape["max_ms"], command["duration_ms"])
+            shape["documents"] += command["documents"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-route totals, heaviest routes (by total database time) first"""
+        with self._lock:
+            routes = []
+            for label, route in self._routes.items():
+                shapes = sorted(
+                    ({"shape": shape, **stats} for shape, stats in route["shapes"].items()),
+                    key=lambda item: item["total_ms"],
+                    reverse=True,
+                )
+                routes.append({
+                    "route": label,
+                    "requests": route["requests"],
+                    "commands": route["commands"],
+                    "commands_per_request": round(route["commands"] / route["requests"], 2) if route["requests"] else None,
+                    "total_ms": round(route["total_ms"], 2),
+                    "max_ms": round(route["max_ms"], 2),
+                    "documents": route["documents"],
+                    "shapes": [{**item, "total_ms": round(item["total_ms"], 2), "max_ms": round(item["max_ms"], 2)} for item in shapes],
+                })
+            slow = list(self.slow_log)
+        routes.sort(key=lambda item: item["total_ms"], reverse=True)
+        return {"slow_ms": self.slow_ms, "routes": routes, "slow_queries": slow}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self.slow_log.clear()
+
+
+class QueryMonitorMiddleware:
+    """ASGI middleware giving each HTTP request its own RequestQueries"""
+
+    def __init__(self, app, monitor: QueryMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = RequestQueries(scope)
+        token = _current_request.set(request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_request.reset(token)
+            self.monitor.finish_request(request)
+
+
+class NPlusOneQueryError(RuntimeError):
+    pass
+
+
+class NPlusOneMiddleware:
+    """
+    Flags requests that issue the same query shape more than `threshold`
+    times, the signature of a query inside a Python loop. Logs a warning, or
+    raises NPlusOneQueryError when `raise_errors` is set (tests/CI).
+
+    Must run inside QueryMonitorMiddleware, which collects the commands.
+    """
+
+    def __init__(self, app, threshold: int = 5, raise_errors: bool = False):
+        self.app = app
+        self.threshold = threshold
+        self.raise_errors = raise_errors
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        if scope["type"] != "http":
+            return
+        request = current_request_queries()
+        if request is None:
+            return
+        repeated = {shape: count for shape, count in request.shape_counts().items() if count > self.threshold}
+        if not repeated:
+            return
+
+        label = request.label
+        for shape, count in repeated.items():
+            print(f"[n+1] {label} issued {count}x {shape}")
+        if self.raise_errors:
+            details = "; ".join(f"{count}x {shape}" for shape, count in repeated.items())
+            raise NPlusOneQueryError(f"{label} repeated queries: {details}")
@@ -0,0 +1,227 @@
+import json
+import math
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ReturnDocument
+
+
+class RateLimitPolicy:
+    """
+    Token-bucket policy for the routes matching `pattern`.
+
+    `rate` is tokens refilled per second and `burst` the bucket size. `keys`
+    selects what a bucket is keyed by: "ip", "user" (JWT user_id, skipped for
+    anonymous requests) or both, in which case every bucket must allow the call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        rate: float,
+        burst: int,
+        methods: Sequence[str] = ("GET", "POST"),
+        keys: Sequence[str] = ("ip",),
+    ):
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.rate = rate
+        self.burst = burst
+        self.methods = {method.upper() for method in methods}
+        self.keys = tuple(keys)
+
+    def matches(self, method: str, path: str) -> bool:
+        return method in self.methods and self.pattern.match(path) is not None
+
+
+class InMemoryRateLimiter:
+    """
+    Per-process token buckets spread over `shards` dicts. Idle buckets (which
+    would be full again) are swept shard by shard so memory stays bounded.
+    """
+
+    def __init__(self, shards: int = 16, idle_seconds: float = 600, sweep_every: int = 1000):
+        self._shards: List[Dict[str, List[float]]] = [{} for _ in range(shards)]
+        self._hits_since_sweep = [0] * shards
+        self.idle_seconds = idle_seconds
+        self.sweep_every = sweep_every
+
+    async def hit(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; returns 0 when allowed, otherwise seconds until a token is available"""
+        index = hash(key) % len(self._shards)
+        shard = self._shards[index]
+        now = time.monotonic()
+
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = shard[key] = [float(burst), now]
+        else:
+            bucket[0] = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        self._hits_since_sweep[index] += 1
+        if self._hits_since_sweep[index] >= self.sweep_every:
+            self._sweep(index, now)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    async def refund(self, key: str, rate: float, burst: int) -> None:
+        """Give back a token taken by `hit` for a request that was rejected anyway"""
+        bucket = self._shards[hash(key) % len(self._shards)].get(key)
+        if bucket is not None:
+            bucket[0] = min(float(burst), bucket[0] + 1)
+
+    def _sweep(self, index: int, now: float) -> None:
+        shard = self._shards[index]
+        for key in [k for k, (_, updated) in shard.items() if now - updated > self.idle_seconds]:
+            del shard[key]
+        self._hits_since_sweep[index] = 0
+
+
+class MongoRateLimiter:
+    """
+    Token buckets stored in a MongoDB collection so limits hold across workers.
+
+    Refill and take happen atomically in one pipeline update; documents carry
+    an `expires_at` for a TTL index to clean up idle buckets. If Mongo is
+    unavailable the `fallback` limiter is used instead of failing requests.
+    """
+
+    def __init__(self, collection, fallback: Optional[InMemoryRateLimiter] = None, idle_seconds: float = 600):
+        self.collection = collection
+        self.fallback = fallback or InMemoryRateLimiter()
+        self.idle_seconds = idle_seconds
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("expires_at", name="rate_limit_ttl", expireAfterSeconds=0)
+
+    async def hit(self, key: str, rate: float, burst: int) -> float:
+        now = datetime.utcnow()
+        elapsed_seconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        try:
+            bucket = await self.collection.find_one_and_update(
+                {"_id": key},
+                [
+                    {"$set": {
+                        "tokens": {"$min": [
+                            burst,
+                            {"$add": [{"$ifNull": ["$tokens", burst]}, {"$multiply": [elapsed_seconds, rate]}]}
+                        ]},
+                        "updated_at": now,
+                        "expires_at": now + timedelta(seconds=self.idle_seconds),
+                    }},
+                    {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                    {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+                ],
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            print(f"[rate-limit] shared backend unavailable, using local buckets: {str(e)}")
+            return await self.fallback.hit(key, rate, burst)
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / rate
+
+    async def refund(self, key: str, rate: float, burst: int) -> None:
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                [{"$set": {"tokens": {"$min": [burst, {"$add": ["$tokens", 1]}]}}}],
+            )
+        except Exception as e:
+            print(f"[rate-limit] shared backend unavailable, using local buckets: {str(e)}")
+            await self.fallback.refund(key, rate, burst)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying the first matching RateLimitPolicy to each request
+    and answering 429 with a Retry-After header when a bucket is empty.
+
+    Behind proxies, `trusted_proxies` is the number of them in front of the
+    app: the client address is that many entries from the right of
+    X-Forwarded-For, since everything further left is supplied by the client.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter,
+        policies: Sequence[RateLimitPolicy],
+        user_resolver: Optional[Callable[[str], Optional[str]]] = None,
+        trusted_proxies: int = 0,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.policies = list(policies)
+        self.user_resolver = user_resolver
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        policy = next((p for p in self.policies if p.matches(method, path)), None)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = 0.0
+        taken = []
+        for key in self._bucket_keys(policy, scope):
+            wait = await self.limiter.hit(key, policy.rate, policy.burst)
+            if wait > 0:
+                retry_after = max(retry_after, wait)
+            else:
+                taken.append(key)
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+        # Rejected: an empty bucket must not drain the others
+        for key in taken:
+            await self.limiter.refund(key, policy.rate, policy.burst)
+
+        body = json.dumps({"detail": "Too many requests, please retry later"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _bucket_keys(self, policy: RateLimitPolicy, scope) -> List[str]:
+        headers = dict(scope.get("headers") or [])
+        keys = []
+        if "ip" in policy.keys:
+            keys.append(f"{policy.name}:ip:{self._client_ip(scope, headers)}")
+        if "user" in policy.keys and self.user_resolver is not None:
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            if authorization.lower().startswith("bearer "):
+                user_id = self.user_resolver(authorization[7:].strip())
+                if user_id:
+                    keys.append(f"{policy.name}:user:{user_id}")
+        return keys
+
+    def _client_ip(self, scope, headers: Dict[bytes, bytes]) -> str:
+        if self.trusted_proxies > 0:
+            forwarded = headers.get(b"x-forwarded-for")
+            if forwarded:
+                addresses = [address.strip() for address in forwarded.decode("latin-1").split(",") if address.strip()]
+                if addresses:
+                    return addresses[-min(self.trusted_proxies, len(addresses))]
+        client: Optional[Tuple[str, int]] = scope.get("client")
+        return client[0] if client else "unknown"
@@ -0,0 +1,52 @@
+import re
+from typing import Any, Dict, Iterable, Optional
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+from utils.json_response import dumps
+
+try:
+    import bsonjs
+except ImportError:  # optional: python-bsonjs
+    bsonjs = None
+
+BSONJS_AVAILABLE = bsonjs is not None
+
+# Collections fetched with these options yield undecoded RawBSONDocument
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# bsonjs writes libbson's relaxed extended JSON; flatten the two wrappers our
+# documents use into the strings serialize_object always produced.
+# (Inside JSON strings quotes are escaped, so these cannot match user text.)
+_OBJECT_ID = re.compile(r'\{ "\$oid" : ("[0-9a-f]{24}") \}')
+_DATE = re.compile(r'\{ "\$date" : "(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?Z" \}')
+
+
+def _date(match) -> str:
+    # Mongo dates have millisecond precision; isoformat() prints microseconds, or nothing when zero
+    fraction = f".{match.group(2).ljust(6, '0')}" if match.group(2) else ""
+    return f'"{match.group(1)}{fraction}"'
+
+
+def raw_to_json(document: RawBSONDocument) -> bytes:
+    """
+    JSON for one raw document without building Python dicts. Documents holding
+    other extended types (pre-1970 dates, NaN, Decimal128, binary...) are
+    decoded and encoded with orjson instead.
+    """
+    if bsonjs is not None:
+        text = _DATE.sub(_date, _OBJECT_ID.sub(r"\1", bsonjs.dumps(document.raw)))
+        if '{ "$' not in text:
+            return text.encode("utf-8")
+    return dumps(bson.decode(document.raw))
+
+
+def raw_list_body(key: str, documents: Iterable[RawBSONDocument], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """b'{"<key>": [doc, doc, ...], <extra>...}' from raw documents"""
+    parts = [raw_to_json(document) for document in documents]
+    body = b'{' + dumps(key) + b':[' + b','.join(parts) + b']'
+    for name, value in (extra or {}).items():
+        body += b',' + dumps(name) + b':' + dumps(value)
+    return body + b'}'
@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class SessionCache:
+    """
+    In-process cache of validated user sessions keyed by (user_id, session_id).
+
+    Entries expire after `ttl_seconds` and the cache never holds more than
+    `max_entries` sessions (least recently used entries are evicted first).
+    Anything that ends a session must call `invalidate` / `invalidate_user`.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._user_index: Dict[str, set] = {}
+
+    def get(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a session, or None if missing/expired"""
+        key = (user_id, session_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires_at"] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, user_id: str, session_id: str, **data: Any) -> Dict[str, Any]:
+        """Cache a session that was just validated against the database"""
+        key = (user_id, session_id)
+        entry = {**data, "expires_at": time.monotonic() + self.ttl_seconds}
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._user_index.setdefault(user_id, set()).add(session_id)
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+        return entry
+
+    def invalidate(self, user_id: str, session_id: str) -> None:
+        """Drop a single session from the cache"""
+        self._remove((user_id, session_id))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached session belonging to a user"""
+        for session_id in list(self._user_index.get(user_id, ())):
+            self._remove((user_id, session_id))
+
+    def forget_profiles(self, user_id: str) -> None:
+        """Drop user profile data cached alongside a user's sessions, keeping the sessions"""
+        for session_id in self._user_index.get(user_id, ()):
+            entry = self._entries.get((user_id, session_id))
+            if entry is not None:
+                entry.pop("profile", None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._user_index.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        user_id, session_id = key
+        sessions = self._user_index.get(user_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self._user_index[user_id]
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+
+class SessionGenerationMap:
+    """
+    Compact in-memory map of user_id -> current session generation.
+
+    Every login bumps the user's generation, so a token is valid only while
+    the generation it carries is still the current one. Missing users are
+    loaded lazily through `loader`; entries expire after `ttl_seconds` so a
+    bump made by another process is picked up eventually.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Optional[int]]],
+        ttl_seconds: float = 60,
+        max_entries: int = 200000,
+    ):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    async def current(self, user_id: str) -> Optional[int]:
+        """Return the user's current generation, loading it on a miss"""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        generation = await self.loader(user_id)
+        if generation is None:
+            self._entries.pop(user_id, None)
+            return None
+        self.set(user_id, generation)
+        return generation
+
+    def set(self, user_id: str, generation: int) -> None:
+        """Record a generation; never moves a user backwards"""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > generation and entry[1] > time.monotonic():
+            generation = entry[0]
+        self._entries[user_id] = (generation, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
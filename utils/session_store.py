@@ -0,0 +1,223 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, InsertOne, ReturnDocument, UpdateMany, UpdateOne
+
+
+class SessionStore:
+    """
+    Database side of user sessions (single active session per user).
+
+    Each login allocates a new `session_generation` on the user document and
+    replaces the user's active session. `login` does both in one concurrent
+    round trip when the caller already holds the user document.
+
+    Ended sessions are rolled up into `summaries` (one document per user) by
+    `compact_ended_sessions`; a TTL index on `ended_at` (see utils/indexes.py)
+    removes anything the compaction job has not picked up.
+    """
+
+    def __init__(self, users, sessions, summaries=None):
+        self.users = users
+        self.sessions = sessions
+        self.summaries = summaries
+
+    async def open_session(self, user_id: str, generation: int, device_info: Optional[dict] = None) -> str:
+        """End the user's active sessions and insert a new one with a single bulk_write"""
+        now = datetime.utcnow()
+        session_id = str(uuid.uuid4())
+        await self.sessions.bulk_write([
+            UpdateMany(
+                {"user_id": ObjectId(user_id), "is_active": True},
+                {"$set": {"is_active": False, "ended_at": now}}
+            ),
+            InsertOne({
+                "user_id": ObjectId(user_id),
+                "session_id": session_id,
+                "session_generation": generation,
+                "is_active": True,
+                "device_info": device_info or {},
+                "created_at": now,
+                "last_activity": now,
+                "ended_at": None
+            })
+        ], ordered=True)
+        return session_id
+
+    async def allocate_generation(
+        self,
+        user_id: str,
+        user_updates: Optional[Dict[str, Any]] = None,
+        expected: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Increment the user's session generation (applying `user_updates` in the
+        same write). With `expected`, only bump if that is still current.
+        Returns the new generation, or None if nothing matched.
+        """
+        query: Dict[str, Any] = {"_id": ObjectId(user_id)}
+        if expected is not None:
+            query["session_generation"] = expected
+        update: Dict[str, Any] = {"$inc": {"session_generation": 1}}
+        if user_updates:
+            update["$set"] = user_updates
+        user = await self.users.find_one_and_update(
+            query,
+            update,
+            projection={"session_generation": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return user["session_generation"] if user else None
+
+    async def login(
+        self,
+        user: Dict[str, Any],
+        device_info: Optional[dict] = None,
+        user_updates: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, int]:
+        """
+        Start a session for an already-loaded user document.
+
+        The next generation is predicted from the document and claimed with a
+        compare-and-set that runs concurrently with the session write. If a
+        concurrent login claimed it first, our session is ended again and we
+        fall back to the sequential path.
+        """
+        user_id = str(user["_id"])
+        known = user.get("session_generation") or 0
+        generation = known + 1
+        generation_filter = known if known else {"$in": [0, None]}
+
+        claim, session_id = await asyncio.gather(
+            self.users.update_one(
+                {"_id": user["_id"], "session_generation": generation_filter},
+                {"$set": {**(user_updates or {}), "session_generation": generation}}
+            ),
+            self.open_session(user_id, generation, device_info)
+        )
+        if claim.matched_count:
+            return session_id, generation
+
+        await self.end_session(user_id, session_id)
+        generation = await self.allocate_generation(user_id, user_updates)
+        if generation is None:
+            raise LookupError(f"user {user_id} not found")
+        session_id = await self.open_session(user_id, generation, device_info)
+        return session_id, generation
+
+    async def end_session(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        """End one session; returns the session's previous state (with its generation)"""
+        return await self.sessions.find_one_and_update(
+            {"user_id": ObjectId(user_id), "session_id": session_id},
+            {"$set": {"is_active": False, "ended_at": datetime.utcnow()}},
+            projection={"session_generation": 1, "is_active": 1}
+        )
+
+    async def end_user_sessions(self, user_id: str) -> int:
+        """End every active session of a user"""
+        result = await self.sessions.update_many(
+            {"user_id": ObjectId(user_id), "is_active": True},
+            {"$set": {"is_active": False, "ended_at": datetime.utcnow()}}
+        )
+        return result.modified_count
+
+    async def find_active(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self.sessions.find_one({
+            "user_id": ObjectId(user_id),
+            "session_id": session_id,
+            "is_active": True
+        })
+
+    async def compact_ended_sessions(
+        self,
+        ended_before: datetime,
+        batch_size: int = 1000,
+        claim_timeout_seconds: float = 600
+    ) -> int:
+        """
+        Archive sessions that ended before `ended_before` into per-user summaries
+        and delete them from the hot collection. Returns the number archived.
+
+        Every worker runs this; each batch is first claimed by stamping
+        `archiving` with a token of this run, and only the rows carrying it are
+        summarised and deleted, so concurrent runs never count a session twice.
+        Claims older than `claim_timeout_seconds` (a run that died) are taken over.
+        """
+        if self.summaries is None:
+            return 0
+        token = uuid.uuid4().hex
+        archived = 0
+        while True:
+            now = datetime.utcnow()
+            claimable = {
+                "ended_at": {"$lt": ended_before},
+                "$or": [
+                    {"archiving": {"$exists": False}},
+                    {"archiving_at": {"$lt": now - timedelta(seconds=claim_timeout_seconds)}},
+                ],
+            }
+            candidates = await self.sessions.find(claimable, {"_id": 1}).sort(
+                "ended_at", ASCENDING
+            ).limit(batch_size).to_list(batch_size)
+            if not candidates:
+                return archived
+
+            # Each row matches the filter for one claimant only; the rest are skipped
+            await self.sessions.update_many(
+                {**claimable, "_id": {"$in": [session["_id"] for session in candidates]}},
+                {"$set": {"archiving": token, "archiving_at": now}}
+            )
+            batch = await self.sessions.find(
+                {"archiving": token},
+                {"user_id": 1, "created_at": 1, "last_activity": 1, "ended_at": 1}
+            ).to_list(None)
+            if not batch:
+                # Another worker claimed all of them; look for more
+                continue
+
+            per_user: Dict[Any, Dict[str, Any]] = {}
+            for session in batch:
+                summary = per_user.setdefault(session["user_id"], {
+                    "count": 0,
+                    "first_session_at": session.get("created_at"),
+                    "last_session_at": session.get("created_at"),
+                    "last_activity": session.get("last_activity"),
+                    "last_ended_at": session.get("ended_at"),
+                })
+                summary["count"] += 1
+                for field, source, pick in (
+                    ("first_session_at", "created_at", min),
+                    ("last_session_at", "created_at", max),
+                    ("last_activity", "last_activity", max),
+                    ("last_ended_at", "ended_at", max),
+                ):
+                    value = session.get(source)
+                    if value is not None:
+                        summary[field] = value if summary[field] is None else pick(summary[field], value)
+
+            now = datetime.utcnow()
+            operations = []
+            for user_id, summary in per_user.items():
+                update: Dict[str, Any] = {
+                    "$inc": {"session_count": summary["count"]},
+                    "$set": {"updated_at": now},
+                }
+                for field, operator in (
+                    ("first_session_at", "$min"),
+                    ("last_session_at", "$max"),
+                    ("last_activity", "$max"),
+                    ("last_ended_at", "$max"),
+                ):
+                    if summary[field] is not None:
+                        update.setdefault(operator, {})[field] = summary[field]
+                operations.append(UpdateOne({"user_id": user_id}, update, upsert=True))
+            await self.summaries.bulk_write(operations, ordered=False)
+
+            # Summaries are written first: a failure here can only double count, never lose sessions
+            await self.sessions.delete_many({"archiving": token})
+            archived += len(batch)
+            if len(candidates) < batch_size:
+                return archived